@@ -0,0 +1,286 @@
+import asyncio
+import datetime
+import gc
+import itertools
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.asgi import get_asgi_application
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from events.models import Category, Event
+from events.rsvp import bulk_add_participants
+from events.search import get_search_backend
+
+User = get_user_model()
+
+ROLES = ('Admin', 'Organizer', 'Participant')
+LOCATIONS = ('Dhaka', 'Chattogram', 'Sylhet', 'Khulna', 'Rajshahi', 'Barishal')
+WORDS = (
+    'music', 'tech', 'startup', 'football', 'cricket', 'art', 'food', 'film',
+    'science', 'career', 'health', 'charity', 'workshop', 'summit', 'festival', 'meetup',
+)
+
+
+# Synthetic dataset
+def seed(events=1000, categories=20, users=500, rsvps=5000, random_seed=0):
+    rng = random.Random(random_seed)
+    today = now().date()
+    groups = {name: Group.objects.get_or_create(name=name)[0] for name in ROLES}
+
+    category_objs = Category.objects.bulk_create([
+        Category(name=f"{WORDS[i % len(WORDS)].title()} {i}", description="Synthetic category")
+        for i in range(categories)
+    ])
+    Event.objects.bulk_create([
+        Event(
+            name=' '.join(rng.choice(WORDS) for _ in range(3)).title(),
+            description=' '.join(rng.choice(WORDS) for _ in range(40)),
+            date=today + datetime.timedelta(days=rng.randint(-180, 180)),
+            time=datetime.time(rng.randint(8, 21), rng.choice((0, 15, 30, 45))),
+            location=rng.choice(LOCATIONS),
+            category=rng.choice(category_objs),
+        )
+        for _ in range(events)
+    ], batch_size=2000)
+    # bulk_create skips the post_save indexing, so home_search would otherwise search an empty index
+    get_search_backend().rebuild()
+
+    # One shared hash: hashing a password per synthetic user would dominate seeding time
+    password = make_password('benchmark')
+    User.objects.bulk_create([
+        User(username=f'bench_user_{i}', email=f'bench_user_{i}@example.com', password=password)
+        for i in range(users)
+    ], batch_size=2000)
+    role_users = dict(zip(ROLES, User.objects.bulk_create([
+        User(username=f'bench_{role.lower()}', email=f'bench_{role.lower()}@example.com', password=password)
+        for role in ROLES
+    ])))
+    Membership = User.groups.through
+    member_ids = list(User.objects.filter(username__startswith='bench_user_').values_list('id', flat=True))
+    Membership.objects.bulk_create(
+        [Membership(customuser_id=user_id, group_id=groups['Participant'].id) for user_id in member_ids]
+        + [Membership(customuser_id=user.id, group_id=groups[role].id) for role, user in role_users.items()],
+        batch_size=2000,
+    )
+
+    event_ids = list(Event.objects.values_list('id', flat=True))
+    pairs = {(rng.choice(event_ids), rng.choice(member_ids)) for _ in range(rsvps)} if event_ids and member_ids else set()
+    # The benchmark participant holds a few RSVPs so its dashboard has rows to render
+    pairs.update((event_id, role_users['Participant'].id) for event_id in event_ids[:20])
+    bulk_add_participants(pairs)
+    return role_users, event_ids
+
+
+# Scenarios: (name, role, method, url builder); builders get the iteration number and the seeded event ids
+SCENARIOS = (
+    ('home', 'Participant', 'get', lambda i, ids: reverse('home')),
+    ('home_search', 'Participant', 'get', lambda i, ids: f"{reverse('home')}?search={WORDS[i % len(WORDS)]}"),
+    ('event_list', 'Organizer', 'get', lambda i, ids: reverse('event_list')),
+    ('event_details', 'Participant', 'get', lambda i, ids: reverse('event_details', args=[ids[i % len(ids)]])),
+    ('rsvp_event', 'Participant', 'post', lambda i, ids: reverse('rsvp_event', args=[ids[-1 - i % len(ids)]])),
+    ('admin_dashboard', 'Admin', 'get', lambda i, ids: reverse('admin_dashboard')),
+    ('organizer_dashboard', 'Organizer', 'get', lambda i, ids: reverse('organizer_dashboard')),
+    ('participant_dashboard', 'Participant', 'get', lambda i, ids: reverse('participant_dashboard')),
+)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def request(client, method, url):
+    response = getattr(client, method)(url)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method.upper()} {url} returned {response.status_code}")
+    return response
+
+
+def measure(client, method, url_for, event_ids, iterations, warmup, offset=0):
+    for i in range(warmup):
+        request(client, method, url_for(offset + i, event_ids))
+    offset += warmup
+
+    latencies, query_counts = [], []
+    for i in range(iterations):
+        url = url_for(offset + i, event_ids)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            request(client, method, url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        query_counts.append(len(queries))
+    offset += iterations
+
+    # Allocations are sampled in a separate pass: tracemalloc slows every allocation down and would skew latency
+    peaks, allocated = [], []
+    for i in range(min(iterations, 10)):
+        url = url_for(offset + i, event_ids)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        request(client, method, url)
+        after = tracemalloc.take_snapshot()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        allocated.append(sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0))
+
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'queries': max(query_counts),
+        'peak_kib': round(percentile(peaks, 50) / 1024, 1),
+        'retained_kib': round(percentile(allocated, 50) / 1024, 1),
+    }
+
+
+def run_benchmark(role_users, event_ids, iterations=50, warmup=5, scenarios=None):
+    results = {}
+    for name, role, method, url_for in SCENARIOS:
+        if scenarios and name not in scenarios:
+            continue
+        client = Client()
+        client.force_login(role_users[role])
+        results[name] = measure(client, method, url_for, event_ids, iterations, warmup)
+    return results
+
+
+# ASGI throughput: each page through its sync and its async view, served by the real ASGI handler
+ASGI_SCENARIOS = (
+    ('home', 'Participant', lambda name, i, ids: reverse(name)),
+    ('event_list', 'Organizer', lambda name, i, ids: reverse(name)),
+    ('event_details', 'Participant', lambda name, i, ids: reverse(name, args=[ids[i % len(ids)]])),
+    ('admin_dashboard', 'Admin', lambda name, i, ids: reverse(name)),
+    ('organizer_dashboard', 'Organizer', lambda name, i, ids: reverse(name)),
+    ('participant_dashboard', 'Participant', lambda name, i, ids: reverse(name)),
+)
+
+
+async def asgi_get(application, url, cookie):
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client never disconnects; the handler cancels this wait once the response is sent
+        await asyncio.Event().wait()
+
+    status = None
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    if status >= 400:
+        raise RuntimeError(f"GET {url} returned {status}")
+
+
+async def drive(application, url_for, event_ids, cookie, concurrency, requests):
+    # `concurrency` clients share one request counter, as a load generator with a fixed pool would
+    counter = itertools.count()
+    latencies = []
+
+    async def client():
+        while (i := next(counter)) < requests:
+            started = time.perf_counter()
+            await asgi_get(application, url_for(i, event_ids), cookie)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests_per_s': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+    }
+
+
+def run_asgi_benchmark(role_users, event_ids, concurrency=(1, 8, 32), requests=200, scenarios=None):
+    application = get_asgi_application()
+    cookies = {}
+    for role, user in role_users.items():
+        client = Client()
+        client.force_login(user)
+        cookies[role] = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    results = {}
+    for name, role, url_for in ASGI_SCENARIOS:
+        if scenarios and name not in scenarios:
+            continue
+        results[name] = {}
+        for clients in concurrency:
+            results[name][clients] = {
+                mode: asyncio.run(drive(
+                    application, lambda i, ids, view=view: url_for(view, i, ids), event_ids, cookies[role],
+                    clients, requests,
+                ))
+                for mode, view in (('sync', name), ('async', f'async_{name}'))
+            }
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def environment():
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'timestamp': now().isoformat(),
+    }
+
+
+# Comparison: positive change means slower / more queries than the baseline
+def compare(baseline, current, metrics=('p50_ms', 'p95_ms', 'queries', 'peak_kib')):
+    rows = []
+    for name, result in current.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in metrics:
+            before, after = previous.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append((name, metric, before, after, change))
+    return rows
@@ -0,0 +1,95 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.timezone import now
+
+
+VERSION_KEY = 'event_stats:version'
+
+
+def get_cache():
+    return caches[settings.STATS_CACHE_ALIAS]
+
+
+def is_process_local(cache):
+    # A bump in one worker is only seen by the others through a shared backend
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+# Versioning: every Event/Category write bumps the version, orphaning all older entries at once
+def stats_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost version key never resurrects entries written before it was lost
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _incr_stats_version():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+
+
+def bump_stats_version():
+    _incr_stats_version()
+    # A reader between this bump and the commit still sees the old rows under the new version; bump again once
+    # they are visible
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(_incr_stats_version)
+
+
+def versioned_key(name, *parts):
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    # The date is part of every key because "upcoming" moves at midnight
+    return f'{name}:{stats_version()}:{now().date().isoformat()}:{digest}'
+
+
+def get_or_build(name, builder, *parts):
+    cache = get_cache()
+    key = versioned_key(name, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, settings.STATS_CACHE_TIMEOUT)
+    return value
+
+
+async def aget_or_build(name, builder, *parts):
+    # builder is a coroutine function, so its queries can run concurrently
+    cache = get_cache()
+    key = await sync_to_async(versioned_key)(name, *parts)
+    value = await cache.aget(key)
+    if value is None:
+        value = await builder()
+        await cache.aset(key, value, settings.STATS_CACHE_TIMEOUT)
+    return value
+
+
+# Fragments: keys carry everything the cached markup shows, so a changed row simply misses
+def get_fragment_cache():
+    return caches[settings.FRAGMENT_CACHE_ALIAS]
+
+
+def event_fragment_key(name, event):
+    # participant_count moves without touching updated_at (F() updates), so it is part of the key;
+    # the category is only consulted when already loaded, never fetched for the key
+    category = event.category if type(event).category.is_cached(event) else None
+    return ':'.join(str(part) for part in (
+        'fragment', name, event.pk,
+        event.updated_at.timestamp(),
+        event.participant_count,
+        category.updated_at.timestamp() if category else event.category_id,
+        # Cards fall back to the original image until the derivatives exist
+        int(event.image_derivatives_ready),
+    ))
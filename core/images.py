@@ -0,0 +1,108 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Widths cover the 64px table thumbnails up to the full-width detail image
+WIDTHS = (64, 128, 256, 512, 1024)
+FORMATS = (
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+)
+
+# Sent with the original's name once its whole derivative set is stored
+derivatives_generated = Signal()
+
+_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_DERIVATIVE_WORKERS, thread_name_prefix='image-derivatives')
+
+
+# Naming: event_images/party.jpg -> event_images/party.jpg.256w.webp, stored next to the original; keeping the
+# source extension stops party.jpg and party.png from sharing a derivative set
+def derivative_name(name, width, extension):
+    return f'{name}.{width}w.{extension}'
+
+
+def derivative_names(name):
+    return [derivative_name(name, width, extension) for extension, _, _ in FORMATS for width in WIDTHS]
+
+
+def marker_name(name):
+    # Written last, so its presence means the whole set is complete
+    return derivative_name(name, WIDTHS[-1], FORMATS[-1][0])
+
+
+# Generation
+def encode(image, image_format, options):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_derivatives(name, storage=default_storage):
+    with storage.open(name, 'rb') as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image.load()
+    if image.mode == 'P':
+        image = image.convert('RGBA')
+
+    for extension, image_format, options in FORMATS:
+        for width in WIDTHS:
+            resized = image.copy()
+            # Never upscale: small originals are stored at their own size under every width name
+            resized.thumbnail((width, width * 4), Image.LANCZOS)
+            target = derivative_name(name, width, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(encode(resized, image_format, options)))
+    derivatives_generated.send(sender=type(storage), name=name)
+
+
+def delete_derivatives(name, storage=default_storage):
+    for target in derivative_names(name):
+        if storage.exists(target):
+            storage.delete(target)
+    _ready.discard(name)
+
+
+def _generate_safely(name):
+    try:
+        generate_derivatives(name)
+    except Exception:
+        logger.exception("Failed to generate image derivatives for %s", name)
+    finally:
+        # Receivers may have touched the database from this pool thread
+        connections.close_all()
+
+
+def schedule_derivatives(name):
+    # Off-request: resize after the upload is committed, on the shared worker pool
+    transaction.on_commit(lambda: _executor.submit(_generate_safely, name))
+
+
+# Lookup: only positive answers are remembered, so sets finished by another process show up on the next render
+_ready = set()
+
+
+def derivatives_ready(name):
+    if name in _ready:
+        return True
+    if default_storage.exists(marker_name(name)):
+        _ready.add(name)
+        return True
+    return False
+
+
+def srcset(name, extension):
+    return ', '.join(
+        f'{default_storage.url(derivative_name(name, width, extension))} {width}w' for width in WIDTHS
+    )
@@ -0,0 +1,107 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmark import SCENARIOS, compare, environment, run_asgi_benchmark, run_benchmark, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with synthetic events, users and RSVPs, drive the main pages "
+        "through the test client and report p50/p95 latency, query counts and allocations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--rsvps', type=int, default=5000)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--scenario', action='append', choices=[name for name, *_ in SCENARIOS],
+            help="Only run this scenario; may be repeated.",
+        )
+        parser.add_argument(
+            '--asgi', action='store_true',
+            help="Also serve the pages that have async views through the ASGI handler and compare throughput.",
+        )
+        parser.add_argument(
+            '--concurrency', type=int, action='append',
+            help="Concurrent clients for --asgi; may be repeated (default: 1, 8 and 32).",
+        )
+        parser.add_argument('--requests', type=int, default=200, help="Requests per --asgi measurement.")
+        parser.add_argument('--output', help="Write the results to this JSON file.")
+        parser.add_argument('--compare', help="Compare against a JSON file written by an earlier run.")
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1")
+        if options['requests'] < 1 or any(clients < 1 for clients in options['concurrency'] or ()):
+            raise CommandError("--requests and --concurrency must be at least 1")
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.monotonic()
+            role_users, event_ids = seed(
+                events=options['events'], categories=options['categories'], users=options['users'],
+                rsvps=options['rsvps'], random_seed=options['seed'],
+            )
+            if not event_ids:
+                raise CommandError("--events must be at least 1")
+            self.stdout.write(f"Seeded in {time.monotonic() - started:.1f}s")
+            results = run_benchmark(role_users, event_ids, options['iterations'], options['warmup'], options['scenario'])
+            asgi_results = run_asgi_benchmark(
+                role_users, event_ids, options['concurrency'] or (1, 8, 32), options['requests'], options['scenario'],
+            ) if options['asgi'] else None
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'environment': environment(),
+            'dataset': {key: options[key] for key in ('events', 'categories', 'users', 'rsvps', 'seed')},
+            'results': results,
+        }
+
+        self.stdout.write(f"{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'queries':>10}{'peak KiB':>11}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['queries']:>10}{result['peak_kib']:>11.1f}"
+            )
+
+        if asgi_results:
+            report['asgi'] = asgi_results
+            self.stdout.write(
+                f"\n{'ASGI scenario':<24}{'clients':>8}{'sync req/s':>12}{'async req/s':>13}"
+                f"{'sync p95':>10}{'async p95':>11}"
+            )
+            for name, by_clients in asgi_results.items():
+                for clients, modes in by_clients.items():
+                    self.stdout.write(
+                        f"{name:<24}{clients:>8}{modes['sync']['requests_per_s']:>12.1f}"
+                        f"{modes['async']['requests_per_s']:>13.1f}{modes['sync']['p95_ms']:>10.2f}"
+                        f"{modes['async']['p95_ms']:>11.2f}"
+                    )
+
+        if baseline:
+            self.stdout.write(f"\nCompared with {options['compare']} ({baseline['environment'].get('commit') or 'unknown commit'}):")
+            for name, metric, before, after, change in compare(baseline['results'], results):
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+                self.stdout.write(style(f"{name:<24}{metric:<10}{before:>10}{after:>10}{change:>+9.1f}%"))
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.images import derivatives_ready, generate_derivatives
+from events.models import Event
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Backfill thumbnail and WebP derivatives for existing event images and profile pictures."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--force', action='store_true', help="Regenerate derivatives that already exist.")
+
+    def handle(self, *args, **options):
+        events = Event.objects.exclude(image='').exclude(image=None)
+        pictures = set(User.objects.exclude(profile_picture='').values_list('profile_picture', flat=True).distinct())
+        if not options['force']:
+            # Event rows record readiness themselves; profile pictures are checked in storage
+            events = events.filter(image_derivatives_ready=False)
+            pictures = {name for name in pictures if not derivatives_ready(name)}
+        names = set(events.values_list('image', flat=True).distinct()) | pictures
+
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(generate_derivatives, name): name for name in sorted(names)}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Generated derivatives for {done} image(s), {failed} failed"))
@@ -0,0 +1,108 @@
+import bisect
+import threading
+
+# Upper bounds in seconds (timings) or queries (counts); the implicit last bucket is +Inf
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+METRICS = {
+    'request_seconds': ("Wall time from the first middleware to the response", SECONDS_BUCKETS),
+    'db_seconds': ("Time spent executing SQL", SECONDS_BUCKETS),
+    'db_queries': ("SQL statements executed", COUNT_BUCKETS),
+    'template_seconds': ("Time spent rendering the outermost template, including lazy queries", SECONDS_BUCKETS),
+}
+PREFIX = 'django_view_'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation, as histogram_quantile() would estimate
+        target = q * self.count
+        for bound, total in self.cumulative():
+            if total >= target:
+                return bound
+        return float('inf')
+
+
+# In-process only: every worker process keeps its own registry, so scrape each one or sum them downstream
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, view, values):
+        with self._lock:
+            for name, value in values.items():
+                key = (name, view)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(METRICS[name][1])
+                self._histograms[key].observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: (histogram.buckets, list(histogram.counts), histogram.sum, histogram.count)
+                for key, histogram in self._histograms.items()
+            }
+
+    def summary(self):
+        views = {}
+        for (name, view), (buckets, counts, total, count) in sorted(self.snapshot().items()):
+            histogram = Histogram(buckets)
+            histogram.counts, histogram.sum, histogram.count = counts, total, count
+            views.setdefault(view, {})[name] = {
+                'count': count,
+                'sum': round(total, 6),
+                'mean': round(total / count, 6) if count else 0,
+                'p50': histogram.quantile(0.5),
+                'p95': histogram.quantile(0.95),
+            }
+        return views
+
+    def render_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, (help_text, _) in METRICS.items():
+            metric = PREFIX + name
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} histogram')
+            for (key_name, view), (buckets, counts, total, count) in sorted(snapshot.items()):
+                if key_name != name:
+                    continue
+                label = escape_label(view)
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{metric}_bucket{{view="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{view="{label}"}} {total}')
+                lines.append(f'{metric}_count{{view="{label}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
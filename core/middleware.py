@@ -0,0 +1,206 @@
+import contextvars
+import cProfile
+import itertools
+import os
+import re
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+from core.metrics import registry
+from core.querylog import QueryInspector
+
+current_timings = contextvars.ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.template_seconds = 0.0
+        self.in_template = False
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.db_queries += 1
+
+
+# Template timing: only the outermost render is measured, so includes and inclusion tags are not counted twice.
+# Template.render is wrapped the first time an enabled ProfilingMiddleware starts, never on import.
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    timings = current_timings.get()
+    if timings is None or timings.in_template:
+        return _original_render(self, context)
+    timings.in_template = True
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        timings.template_seconds += time.perf_counter() - started
+        timings.in_template = False
+
+
+def instrument_templates():
+    if Template.render is not _timed_render:
+        Template.render = _timed_render
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unresolved>'
+
+
+def wrap_connections(stack, wrapper):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+
+
+# Both middlewares run in either mode, so async views are not pushed back onto a worker thread.
+# Connections belong to the thread the ORM runs on: under ASGI that is the request's thread-sensitive
+# executor, so async requests install and remove their execute wrappers there.
+class SyncAndAsyncMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    async def get_response_wrapped(self, request, wrapper):
+        stack = ExitStack()
+        await sync_to_async(wrap_connections)(stack, wrapper)
+        try:
+            return await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+
+# Profiling
+class ProfilingMiddleware(SyncAndAsyncMiddleware):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.enabled = getattr(settings, 'PROFILING_ENABLED', True)
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        self.dump_dir = getattr(settings, 'PROFILING_DUMP_DIR', '')
+        self.counter = itertools.count(1)
+        if self.enabled:
+            instrument_templates()
+
+    def handle(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        profiler = self.start_profiler()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                wrap_connections(stack, timings.execute_wrapper)
+                response = self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - started
+            if profiler:
+                profiler.disable()
+            current_timings.reset(token)
+
+        view = view_name(request)
+        if profiler:
+            self.dump_profile(profiler, view)
+        self.record(view, elapsed, timings)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        # No cProfile sampling here: it follows one thread, and an async request hops between the
+        # event loop and its ORM thread, interleaved with other requests
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response_wrapped(request, timings.execute_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_timings.reset(token)
+        self.record(view_name(request), elapsed, timings)
+        return response
+
+    def record(self, view, elapsed, timings):
+        registry.observe(view, {
+            'request_seconds': elapsed,
+            'db_seconds': timings.db_seconds,
+            'db_queries': timings.db_queries,
+            'template_seconds': timings.template_seconds,
+        })
+
+    def start_profiler(self):
+        # 1 in PROFILING_SAMPLE_RATE requests; 0 switches sampling off
+        if not self.sample_rate or next(self.counter) % self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return None
+        return profiler
+
+    def dump_profile(self, profiler, view):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        filename = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', view)}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{time.perf_counter_ns()}.prof"
+        profiler.dump_stats(os.path.join(self.dump_dir, filename))
+
+
+# Slow and repeated SQL, logged as JSON lines through the core.querylog logger
+class QueryLogMiddleware(SyncAndAsyncMiddleware):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.slow_ms = getattr(settings, 'SLOW_QUERY_MS', 0)
+        self.duplicate_threshold = getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 0)
+
+    def inspector(self, request):
+        return QueryInspector(self.slow_ms, self.duplicate_threshold, lambda: {
+            'view': view_name(request),
+            'method': request.method,
+            'path': request.path,
+        })
+
+    def handle(self, request):
+        if not (self.slow_ms or self.duplicate_threshold):
+            return self.get_response(request)
+
+        inspector = self.inspector(request)
+        with ExitStack() as stack:
+            wrap_connections(stack, inspector)
+            response = self.get_response(request)
+        inspector.report_duplicates()
+        return response
+
+    async def __acall__(self, request):
+        if not (self.slow_ms or self.duplicate_threshold):
+            return await self.get_response(request)
+
+        inspector = self.inspector(request)
+        response = await self.get_response_wrapped(request, inspector)
+        inspector.report_duplicates()
+        return response
@@ -0,0 +1,176 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse
+
+NEXT = 'n'
+PREV = 'p'
+
+
+# Cursors
+def encode_cursor(values, direction):
+    raw = json.dumps([direction, values], cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None, None
+    if direction not in (NEXT, PREV) or not isinstance(values, list):
+        return None, None
+    return values, direction
+
+
+def cursor_values(queryset, fields, values):
+    # Cursors come from the client: each value is converted by its ordering field, and a cursor that does
+    # not convert is treated like a malformed one instead of reaching the query
+    if len(values) != len(fields):
+        return None
+    converted = []
+    for (name, _), value in zip(fields, values):
+        annotation = queryset.query.annotations.get(name)
+        field = annotation.output_field if annotation is not None else queryset.model._meta.get_field(name)
+        try:
+            value = field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            return None
+        if value is None:
+            return None
+        converted.append(value)
+    return converted
+
+
+# Keyset filtering
+def parse_ordering(ordering):
+    return [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+
+
+def keyset_filter(fields, values, forward):
+    # (a, b, c) > (x, y, z) expanded into OR-ed prefixes, honouring per-field direction
+    clauses = []
+    for i, (field, descending) in enumerate(fields):
+        lookup = 'lt' if descending == forward else 'gt'
+        equal = {name: value for (name, _), value in zip(fields[:i], values[:i])}
+        clauses.append(Q(**equal, **{f'{field}__{lookup}': values[i]}))
+    return reduce(or_, clauses)
+
+
+def keyset_values(obj, fields):
+    # Model instances or values() rows
+    if isinstance(obj, dict):
+        return [obj[field] for field, _ in fields]
+    return [getattr(obj, field) for field, _ in fields]
+
+
+class KeysetPage:
+    def __init__(self, object_list, fields, has_next, has_previous):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = encode_cursor(keyset_values(object_list[-1], fields), NEXT) if has_next and object_list else None
+        self.prev_cursor = encode_cursor(keyset_values(object_list[0], fields), PREV) if has_previous and object_list else None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def keyset_query(queryset, ordering, cursor=None):
+    fields = parse_ordering(ordering)
+    values, direction = decode_cursor(cursor) if cursor else (None, None)
+    if values is not None:
+        values = cursor_values(queryset, fields, values)
+        if values is None:
+            direction = None
+    forward = direction != PREV
+
+    if forward:
+        queryset = queryset.order_by(*ordering)
+    else:
+        queryset = queryset.order_by(*[field if descending else f'-{field}' for field, descending in fields])
+    if values is not None:
+        queryset = queryset.filter(keyset_filter(fields, values, forward))
+    return queryset, fields, values is not None, forward
+
+
+def keyset_page(rows, fields, page_size, has_cursor, forward):
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if forward:
+        return KeysetPage(rows, fields, has_next=has_more, has_previous=has_cursor)
+    rows.reverse()
+    return KeysetPage(rows, fields, has_next=True, has_previous=has_more)
+
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=20):
+    # Every page is an index range scan of page_size + 1 rows, however deep the cursor is
+    queryset, fields, has_cursor, forward = keyset_query(queryset, ordering, cursor)
+    return keyset_page(list(queryset[:page_size + 1]), fields, page_size, has_cursor, forward)
+
+
+async def akeyset_paginate(queryset, ordering, cursor=None, page_size=20):
+    queryset, fields, has_cursor, forward = keyset_query(queryset, ordering, cursor)
+    rows = [row async for row in queryset[:page_size + 1].aiterator()]
+    return keyset_page(rows, fields, page_size, has_cursor, forward)
+
+
+# Views
+class KeysetPaginationMixin:
+    page_size = 20
+    keyset_ordering = ('date', 'time', 'id')
+    cursor_param = 'cursor'
+    json_fields = ('id',)
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def paginate_keyset(self, queryset):
+        return keyset_paginate(
+            queryset, self.get_keyset_ordering(), self.request.GET.get(self.cursor_param), self.page_size,
+        )
+
+    async def apaginate_keyset(self, queryset):
+        return await akeyset_paginate(
+            queryset, self.get_keyset_ordering(), self.request.GET.get(self.cursor_param), self.page_size,
+        )
+
+    def wants_json(self):
+        return self.request.GET.get('format') == 'json'
+
+    def serialize_object(self, obj):
+        data = {}
+        for path in self.json_fields:
+            value = obj
+            for attr in path.split('.'):
+                value = getattr(value, attr) if value is not None else None
+            data[path.replace('.', '_')] = value
+        return data
+
+    def keyset_json_response(self, page):
+        return JsonResponse({
+            'results': [self.serialize_object(obj) for obj in page],
+            'next': page.next_cursor,
+            'previous': page.prev_cursor,
+        })
+
+    # Views put the current page in context['page']; ?format=json returns it without rendering HTML
+    def render_to_response(self, context, **response_kwargs):
+        if self.wants_json():
+            return self.keyset_json_response(context['page'])
+        return super().render_to_response(context, **response_kwargs)
@@ -0,0 +1,36 @@
+from django.db import connections, router
+
+
+def count_many(**querysets):
+    # COUNT(*) of several querysets in one round trip: SELECT (SELECT COUNT(*) ...) AS a, (...) AS b
+    model = next(iter(querysets.values())).model
+    connection = connections[router.db_for_read(model)]
+    selects, params = [], []
+    for alias, queryset in querysets.items():
+        sql, query_params = queryset.order_by().values('pk').query.sql_with_params()
+        selects.append(f'(SELECT COUNT(*) FROM ({sql}) {alias}_rows) AS {connection.ops.quote_name(alias)}')
+        params.extend(query_params)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(selects)}", params)
+        row = cursor.fetchone()
+    return dict(zip(querysets, row))
+
+
+def estimated_count(queryset):
+    # Returns (count, estimated). An unfiltered PostgreSQL table reads the planner's row estimate instead of
+    # scanning; everything else (filtered querysets, other backends, never-analyzed tables) is counted exactly
+    connection = connections[router.db_for_read(queryset.model)]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0], True
+    return queryset.order_by().count(), False
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset.aiterator()]
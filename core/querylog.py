@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+import sys
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SQL_PREVIEW_LENGTH = 2000
+# Installed packages and the instrumentation itself are never reported as the origin of a query
+_skipped_paths = (
+    os.sep + 'site-packages' + os.sep,
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'middleware.py'),
+)
+
+
+def caller_frame():
+    # Innermost template node or project line that triggered the query, not the ORM internals under it
+    frame = sys._getframe(2)
+    base_dir = str(settings.BASE_DIR)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            if origin is not None:
+                return f"{origin.template_name}:{node.token.lineno}"
+        filename = code.co_filename
+        if filename.startswith(base_dir) and not any(path in filename for path in _skipped_paths):
+            return f"{os.path.relpath(filename, base_dir)}:{frame.f_lineno} in {code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def params_key(params):
+    try:
+        return hash(tuple(params) if isinstance(params, (list, tuple)) else params)
+    except TypeError:
+        return hash(repr(params))
+
+
+class QueryInspector:
+    # Per request: one timer and one dict update per query; stacks are only walked for queries worth reporting
+    def __init__(self, slow_ms, duplicate_threshold, describe):
+        self.slow_seconds = slow_ms / 1000 if slow_ms else None
+        self.duplicate_threshold = duplicate_threshold
+        self.describe = describe
+        self.seen = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.slow_seconds is not None and elapsed >= self.slow_seconds:
+                self.log('slow_query', sql, duration_ms=round(elapsed * 1000, 3), frame=caller_frame())
+            if self.duplicate_threshold and not many:
+                self.record(sql, params, elapsed)
+
+    def record(self, sql, params, elapsed):
+        entry = self.seen.get(sql)
+        if entry is None:
+            self.seen[sql] = entry = {'count': 0, 'duration': 0.0, 'params': set(), 'frame': None}
+        entry['count'] += 1
+        entry['duration'] += elapsed
+        entry['params'].add(params_key(params))
+        if entry['count'] == 2:
+            # The second run is the first repeat; its caller is usually the loop body of an N+1
+            entry['frame'] = caller_frame()
+
+    def report_duplicates(self):
+        for sql, entry in self.seen.items():
+            if entry['count'] >= self.duplicate_threshold:
+                self.log(
+                    'duplicate_queries', sql,
+                    count=entry['count'],
+                    distinct_params=len(entry['params']),
+                    total_ms=round(entry['duration'] * 1000, 3),
+                    frame=entry['frame'],
+                )
+
+    def log(self, event, sql, **fields):
+        logger.warning(event, extra={'query': {
+            'event': event,
+            **self.describe(),
+            **fields,
+            'sql': sql[:SQL_PREVIEW_LENGTH],
+        }})
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'timestamp': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+        }
+        payload.update(getattr(record, 'query', None) or {'message': record.getMessage()})
+        return json.dumps(payload, default=str)
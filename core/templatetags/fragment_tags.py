@@ -0,0 +1,52 @@
+from django import template
+from django.conf import settings
+
+from core.cache import event_fragment_key, get_fragment_cache
+
+register = template.Library()
+
+PREFETCHED = '_prefetched_fragments'
+
+
+# {% prefetch_event_fragments 'home_card' events %} before the loop: one get_many for the whole page
+@register.simple_tag(takes_context=True)
+def prefetch_event_fragments(context, name, events):
+    keys = {(name, event.pk): event_fragment_key(name, event) for event in events}
+    found = get_fragment_cache().get_many(list(keys.values())) if keys else {}
+    prefetched = dict(context.get(PREFETCHED) or {})
+    # Keys are built once here; misses are recorded too, so the block tag asks the cache nothing
+    prefetched.update({slot: (key, found.get(key)) for slot, key in keys.items()})
+    context[PREFETCHED] = prefetched
+    return ''
+
+
+# {% event_fragment 'home_card' event %}...{% endevent_fragment %}: nothing per-user may go inside
+class EventFragmentNode(template.Node):
+    def __init__(self, nodelist, name, event):
+        self.nodelist = nodelist
+        self.name = name
+        self.event = event
+
+    def render(self, context):
+        name, event = self.name.resolve(context), self.event.resolve(context)
+        prefetched = (context.get(PREFETCHED) or {}).get((name, event.pk))
+        cache = get_fragment_cache()
+        if prefetched:
+            key, value = prefetched
+        else:
+            key = event_fragment_key(name, event)
+            value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, settings.FRAGMENT_CACHE_TIMEOUT)
+        return value
+
+
+@register.tag('event_fragment')
+def do_event_fragment(parser, token):
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a fragment name and an event.")
+    nodelist = parser.parse(('endevent_fragment',))
+    parser.delete_first_token()
+    return EventFragmentNode(nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]))
@@ -0,0 +1,24 @@
+from django import template
+from django.utils.html import format_html
+
+from core.images import derivatives_ready, srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt='', css_class='', sizes='100vw', ready=None):
+    if not image:
+        return ''
+    # Events pass their image_derivatives_ready flag; other images ask storage
+    if not (derivatives_ready(image.name) if ready is None else ready):
+        # Derivatives are still being generated (or were never backfilled): serve the original
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">', image.url, alt, css_class)
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy">'
+        '</picture>',
+        srcset(image.name, 'webp'), sizes,
+        image.url, srcset(image.name, 'jpg'), sizes, alt, css_class,
+    )
@@ -0,0 +1,113 @@
+import datetime
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from events.models import Category, Event
+from events.rsvp import bulk_add_participants
+
+User = get_user_model()
+
+# Every budget is checked with a small and a large table, so a per-row query shows up as a failure
+ROW_COUNTS = (10, 1000)
+
+
+class MaxQueriesContext(CaptureQueriesContext):
+    def __init__(self, test_case, budget, connection):
+        self.test_case = test_case
+        self.budget = budget
+        super().__init__(connection)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        executed = len(self)
+        self.test_case.assertLessEqual(
+            executed, self.budget,
+            f"{executed} queries executed, budget is {self.budget}:\n"
+            + "\n".join(f"{i}. {query['sql']}" for i, query in enumerate(self.captured_queries, start=1)),
+        )
+
+
+def max_queries(budget, using=DEFAULT_DB_ALIAS):
+    # Decorator for test methods: the whole test body must stay within the budget
+    def decorator(test_method):
+        @wraps(test_method)
+        def wrapper(self, *args, **kwargs):
+            with MaxQueriesContext(self, budget, connections[using]):
+                return test_method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class QueryBudgetMixin:
+    row_counts = ROW_COUNTS
+
+    def assertMaxQueries(self, budget, using=DEFAULT_DB_ALIAS):
+        return MaxQueriesContext(self, budget, connections[using])
+
+    def assertQueryBudget(self, budget, url, grow=None, method='get', data=None, status=200):
+        # grow(rows) adds rows before each request; a callable url or data is built from whatever grow returned
+        for rows in self.row_counts:
+            grown = grow(rows) if grow else None
+            target = url(grown) if callable(url) else url
+            payload = data(grown) if callable(data) else data
+            # Cold caches: cached statistics and role names must not hide a query that scales with rows
+            for cache in caches.all():
+                cache.clear()
+            with self.subTest(url=target, rows=rows):
+                with self.assertMaxQueries(budget):
+                    response = getattr(self.client, method)(target, payload or {})
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, status)
+
+
+# Fixtures: bulk inserts, so seeding 1000 rows stays cheap and fires no per-row signals
+def make_role_user(username, role):
+    user = User.objects.bulk_create([User(username=username, email=f'{username}@example.com')])[0]
+    user.groups.add(Group.objects.get_or_create(name=role)[0])
+    return user
+
+
+def make_users(count, role=None, prefix='user'):
+    start = User.objects.count()
+    users = User.objects.bulk_create([
+        User(username=f'{prefix}{start + i}', email=f'{prefix}{start + i}@example.com') for i in range(count)
+    ])
+    if role:
+        group = Group.objects.get_or_create(name=role)[0]
+        group.user_set.add(*users)
+    return users
+
+
+def make_categories(count):
+    start = Category.objects.count()
+    return Category.objects.bulk_create([Category(name=f'Category {start + i}') for i in range(count)])
+
+
+def make_events(count, category=None, days=0):
+    category = category or Category.objects.first() or make_categories(1)[0]
+    return Event.objects.bulk_create([
+        Event(
+            name=f'Event {i}', description='Description', location='Dhaka', category=category,
+            date=now().date() + datetime.timedelta(days=days), time=datetime.time(i % 24),
+        )
+        for i in range(count)
+    ])
+
+
+def add_participants(event, count):
+    users = make_users(count, role='Participant', prefix='attendee')
+    bulk_add_participants((event.pk, user.pk) for user in users)
+    return users
+
+
+def add_rsvps(user, events):
+    bulk_add_participants((event.pk, user.pk) for event in events)
@@ -1,3 +1,491 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models.fields.files import ImageFieldFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core import images, middleware
+from core.benchmark import SCENARIOS, compare, percentile, run_benchmark, seed
+from core.cache import (
+    VERSION_KEY, bump_stats_version, event_fragment_key, get_cache, get_fragment_cache, get_or_build, stats_version,
+)
+from core.metrics import registry
+from core.pagination import NEXT, encode_cursor, keyset_paginate
+from core.querylog import JsonLinesFormatter, QueryInspector
+from core.testing import QueryBudgetMixin, add_participants, make_categories, make_events, make_role_user
+from events.models import Category, Event
+
+
+class CoreQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        cls.participant = make_role_user('participant', 'Participant')
+
+    def grow_events(self, rows):
+        events = make_events(rows, self.category, days=1)
+        add_participants(events[0], 3)
+
+    def test_home_anonymous(self):
+        self.assertQueryBudget(5, reverse('home'), self.grow_events)
+
+    def test_home(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(7, reverse('home'), self.grow_events)
+
+    def test_home_filtered(self):
+        self.client.force_login(self.participant)
+        url = f"{reverse('home')}?search=Event&category={self.category.id}"
+        self.assertQueryBudget(8, url, self.grow_events)
+
+    def test_home_json(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(3, f"{reverse('home')}?format=json", self.grow_events)
+
+    def test_async_home_anonymous(self):
+        self.assertQueryBudget(5, reverse('async_home'), self.grow_events)
+
+    def test_async_home(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(7, reverse('async_home'), self.grow_events)
+
+    def test_no_permission(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(0, reverse('no_permission'), self.grow_events)
+
+
+class HomeRSVPStateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.events = make_events(3, make_categories(1)[0], days=1)
+        cls.participant = make_role_user('participant', 'Participant')
+        cls.other = make_role_user('other', 'Participant')
+        cls.events[1].participants.add(cls.participant)
+        cls.events[2].participants.add(cls.other)
+
+    def rsvped(self):
+        results = self.client.get(reverse('home'), {'format': 'json'}).json()['results']
+        return {result['id'] for result in results if result['is_rsvped']}
+
+    def test_only_the_current_users_rsvps_are_flagged(self):
+        self.assertEqual(self.rsvped(), set())
+        self.client.force_login(self.participant)
+        self.assertEqual(self.rsvped(), {self.events[1].id})
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, '✔ RSVPed', count=1)
+        self.assertNotContains(response, reverse('rsvp_event', args=[self.events[1].id]))
+        self.assertContains(response, reverse('rsvp_event', args=[self.events[2].id]))
+
+
+class StatsCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        cls.events = make_events(2, cls.category, days=1)
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_values_are_built_once_per_version(self):
+        builder = Mock(return_value={'total': 1})
+        self.assertEqual(get_or_build('stats', builder, 'a'), {'total': 1})
+        self.assertEqual(get_or_build('stats', builder, 'a'), {'total': 1})
+        get_or_build('stats', builder, 'b')
+        self.assertEqual(builder.call_count, 2)
+        bump_stats_version()
+        get_or_build('stats', builder, 'a')
+        self.assertEqual(builder.call_count, 3)
+
+    def test_writes_invalidate_the_home_totals(self):
+        self.assertContains(self.client.get(reverse('home')), '2 Upcoming Events')
+        self.assertContains(self.client.get(reverse('home')), '2 Upcoming Events')
+        Event.objects.create(
+            name='New', description='Description', location='Dhaka', category=self.category,
+            date=self.events[0].date, time=self.events[0].time,
+        )
+        self.assertContains(self.client.get(reverse('home')), '3 Upcoming Events')
+        Category.objects.create(name='Brand new category')
+        self.assertContains(self.client.get(reverse('home')), 'Brand new category')
+
+    def test_rsvps_and_deletes_bump_the_version(self):
+        version = stats_version()
+        add_participants(self.events[0], 1)[0].rsvp_events.add(self.events[1])
+        self.assertGreater(stats_version(), version)
+        version = stats_version()
+        self.events[1].delete()
+        self.assertGreater(stats_version(), version)
+
+    def test_lost_version_restarts_above_the_old_one(self):
+        version = stats_version()
+        get_cache().delete(VERSION_KEY)
+        self.assertGreater(stats_version(), version)
+
+
+class KeysetPaginationTests(TestCase):
+    ordering = ('date', 'time', 'id')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.events = make_events(7, make_categories(1)[0], days=1)
+        cls.organizer = make_role_user('organizer', 'Organizer')
+
+    def test_cursors_walk_every_row_once_in_both_directions(self):
+        expected = list(Event.objects.order_by(*self.ordering).values_list('id', flat=True))
+        pages, cursor = [], None
+        while True:
+            page = keyset_paginate(Event.objects.all(), self.ordering, cursor, page_size=3)
+            pages.append([event.id for event in page])
+            if not page.next_cursor:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sum(pages, []), expected)
+
+        previous = keyset_paginate(Event.objects.all(), self.ordering, page.prev_cursor, page_size=3)
+        self.assertEqual([event.id for event in previous], pages[-2])
+
+    def test_tampered_cursor_falls_back_to_the_first_page(self):
+        first = [event.id for event in keyset_paginate(Event.objects.all(), self.ordering, None, page_size=3)]
+        for values in (['garbage', 'x', 1], [None, None, None], [[1], {}, 'id'], [1, 2]):
+            with self.subTest(values=values):
+                page = keyset_paginate(Event.objects.all(), self.ordering, encode_cursor(values, NEXT), page_size=3)
+                self.assertEqual([event.id for event in page], first)
+                self.assertFalse(page.has_previous)
+
+    def test_views_ignore_tampered_cursors(self):
+        self.client.force_login(self.organizer)
+        cursor = encode_cursor(['garbage', 'x', 1], NEXT)
+        self.assertEqual(self.client.get(reverse('event_list'), {'cursor': cursor}).status_code, 200)
+        self.assertEqual(self.client.get(reverse('home'), {'cursor': cursor, 'search': 'Event'}).status_code, 200)
+        self.assertEqual(self.client.get(reverse('api_event_list'), {'cursor': 'not base64!'}).status_code, 200)
+
+
+class BenchmarkTests(TestCase):
+    def test_percentile_interpolates(self):
+        self.assertEqual(percentile([5], 95), 5)
+        self.assertEqual(percentile([4, 1, 3, 2, 5], 50), 3)
+        self.assertAlmostEqual(percentile([1, 2, 3, 4, 5], 95), 4.8)
+
+    def test_compare_reports_relative_change(self):
+        baseline = {'home': {'p50_ms': 10.0, 'queries': 0}, 'gone': {'p50_ms': 1.0}}
+        current = {'home': {'p50_ms': 12.5, 'queries': 3}, 'new': {'p50_ms': 1.0}}
+        self.assertEqual(compare(baseline, current, ('p50_ms', 'queries')), [
+            ('home', 'p50_ms', 10.0, 12.5, 25.0),
+            ('home', 'queries', 0, 3, 0.0),
+        ])
+
+    def test_every_scenario_runs_against_a_seeded_dataset(self):
+        role_users, event_ids = seed(events=10, categories=2, users=10, rsvps=20)
+        self.assertEqual(len(event_ids), 10)
+        event = Event.objects.get(pk=event_ids[0])
+        self.assertEqual(event.participant_count, event.participants.count())
+        # The search scenario must measure a search that finds something
+        search_url = dict((name, url_for) for name, _, _, url_for in SCENARIOS)['home_search'](0, event_ids)
+        self.client.force_login(role_users['Participant'])
+        self.assertTrue(self.client.get(f'{search_url}&format=json').json()['results'])
+
+        results = run_benchmark(role_users, event_ids, iterations=2, warmup=1)
+        self.assertEqual(list(results), [name for name, *_ in SCENARIOS])
+        for name, result in results.items():
+            self.assertEqual(result['iterations'], 2, name)
+            self.assertGreater(result['queries'], 0, name)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'], name)
+
+
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        make_events(5, cls.category, days=1)
+        cls.staff = make_role_user('staff', 'Admin')
+        cls.staff.is_staff = True
+        cls.staff.save(update_fields=['is_staff'])
+        cls.participant = make_role_user('participant', 'Participant')
+
+    def setUp(self):
+        registry.reset()
+
+    def test_metrics_are_staff_only(self):
+        self.client.force_login(self.participant)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_accept_bearer_token(self):
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer secret'})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_require_the_bearer_scheme(self):
+        for header in ('secret', 'Basic secret', 'bearer secret', 'Bearersecret'):
+            response = self.client.get(reverse('metrics'), headers={'Authorization': header})
+            self.assertEqual(response.status_code, 403, header)
+
+    def test_templates_are_only_instrumented_when_enabled(self):
+        with patch.object(Template, 'render', middleware._original_render):
+            with override_settings(PROFILING_ENABLED=False):
+                middleware.ProfilingMiddleware(lambda request: None)
+            self.assertIs(Template.render, middleware._original_render)
+            middleware.ProfilingMiddleware(lambda request: None)
+            self.assertIs(Template.render, middleware._timed_render)
+
+    def test_views_are_recorded_per_view_name(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+
+        summary = self.client.get(reverse('metrics'), {'format': 'json'}).json()['views']
+        self.assertEqual(summary['home']['request_seconds']['count'], 2)
+        self.assertGreater(summary['home']['db_queries']['sum'], 0)
+        self.assertGreater(summary['home']['template_seconds']['sum'], 0)
+
+        text = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('# TYPE django_view_request_seconds histogram', text)
+        self.assertIn('django_view_db_queries_count{view="home"} 2', text)
+        self.assertIn('django_view_template_seconds_bucket{view="home",le="+Inf"} 2', text)
+
+    def test_sampled_requests_are_profiled(self):
+        with tempfile.TemporaryDirectory() as dump_dir:
+            with override_settings(PROFILING_SAMPLE_RATE=2, PROFILING_DUMP_DIR=dump_dir):
+                self.client.force_login(self.staff)
+                for _ in range(4):
+                    self.client.get(reverse('home'))
+            self.assertEqual(len([name for name in os.listdir(dump_dir) if name.startswith('home-')]), 2)
+
+
+class QueryLogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.events = make_events(6, make_categories(1)[0])
+
+    def run_queries(self, inspector):
+        with connection.execute_wrapper(inspector):
+            for event in self.events:
+                Event.objects.filter(pk=event.pk).exists()
+        inspector.report_duplicates()
+
+    def logged(self, logs):
+        return [json.loads(JsonLinesFormatter().format(record)) for record in logs.records]
+
+    def test_repeated_sql_is_reported_once_with_its_origin(self):
+        inspector = QueryInspector(0, 5, lambda: {'view': 'test'})
+        with self.assertLogs('core.querylog', 'WARNING') as logs:
+            self.run_queries(inspector)
+
+        [entry] = self.logged(logs)
+        self.assertEqual(entry['event'], 'duplicate_queries')
+        self.assertEqual(entry['view'], 'test')
+        self.assertEqual(entry['count'], 6)
+        self.assertEqual(entry['distinct_params'], 6)
+        self.assertTrue(entry['frame'].startswith('core/tests.py:'))
+
+    def test_slow_queries_are_logged(self):
+        inspector = QueryInspector(0.0001, 0, lambda: {'view': 'test'})
+        with self.assertLogs('core.querylog', 'WARNING') as logs:
+            self.run_queries(inspector)
+
+        entries = self.logged(logs)
+        self.assertEqual(len(entries), 6)
+        self.assertEqual({entry['event'] for entry in entries}, {'slow_query'})
+        self.assertIn('events_event', entries[0]['sql'])
+
+
+def save_image(name, size=(300, 200)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.name = save_image('event_images/photo.png')
+        self.addCleanup(images.delete_derivatives, self.name)
+
+    def test_every_width_and_format_is_written_without_upscaling(self):
+        images.generate_derivatives(self.name)
+        for target in images.derivative_names(self.name):
+            self.assertTrue(default_storage.exists(target), target)
+        with default_storage.open(images.derivative_name(self.name, 256, 'webp')) as small:
+            self.assertEqual(Image.open(small).size, (256, 171))
+        with default_storage.open(images.derivative_name(self.name, 1024, 'jpg')) as large:
+            self.assertEqual(Image.open(large).size, (300, 200))
+
+    def test_sources_differing_only_by_extension_keep_separate_sets(self):
+        other = save_image('event_images/photo.jpg', size=(100, 50))
+        self.addCleanup(images.delete_derivatives, other)
+        images.generate_derivatives(self.name)
+        images.generate_derivatives(other)
+        self.assertTrue(set(images.derivative_names(self.name)).isdisjoint(images.derivative_names(other)))
+        with default_storage.open(images.derivative_name(self.name, 1024, 'webp')) as png_set:
+            self.assertEqual(Image.open(png_set).size, (300, 200))
+        with default_storage.open(images.derivative_name(other, 1024, 'webp')) as jpg_set:
+            self.assertEqual(Image.open(jpg_set).size, (100, 50))
+
+    def test_responsive_image_falls_back_until_the_set_is_complete(self):
+        template = Template('{% load image_tags %}{% responsive_image image alt="Photo" sizes="50vw" %}')
+        image = ImageFieldFile(None, Event._meta.get_field('image'), self.name)
+        self.assertNotIn('srcset', template.render(Context({'image': image})))
+
+        images.generate_derivatives(self.name)
+        html = template.render(Context({'image': image}))
+        self.assertIn('<source type="image/webp" srcset="/media/event_images/photo.png.64w.webp 64w, ', html)
+        self.assertIn('/media/event_images/photo.png.1024w.jpg 1024w" sizes="50vw"', html)
+
+    def test_readiness_is_recorded_on_the_event_row(self):
+        event = make_events(1, make_categories(1)[0])[0]
+        Event.objects.filter(pk=event.pk).update(image=self.name)
+        images.generate_derivatives(self.name)
+        event.refresh_from_db()
+        self.assertTrue(event.image_derivatives_ready)
+
+        event.image = save_image('event_images/replacement.png')
+        event.save()
+        self.addCleanup(default_storage.delete, event.image.name)
+        event.refresh_from_db()
+        self.assertFalse(event.image_derivatives_ready)
+
+    def test_stale_full_save_keeps_the_readiness_flag(self):
+        event = make_events(1, make_categories(1)[0])[0]
+        Event.objects.filter(pk=event.pk).update(image=self.name)
+        event.refresh_from_db()
+        images.generate_derivatives(self.name)
+
+        event.name = 'Renamed'
+        event.save()
+        event.refresh_from_db()
+        self.assertTrue(event.image_derivatives_ready)
+
+    def test_delete_removes_the_whole_set(self):
+        images.generate_derivatives(self.name)
+        self.assertTrue(images.derivatives_ready(self.name))
+        images.delete_derivatives(self.name)
+        self.assertFalse(any(default_storage.exists(target) for target in images.derivative_names(self.name)))
+        self.assertFalse(images.derivatives_ready(self.name))
+        self.assertTrue(default_storage.exists(self.name))
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        cls.events = make_events(3, cls.category, days=1)
+        cls.participant = make_role_user('participant', 'Participant')
+
+    def setUp(self):
+        get_fragment_cache().clear()
+
+    def test_cards_are_fetched_in_one_round_trip(self):
+        self.client.get(reverse('home'))
+        cache = get_fragment_cache()
+        with patch.object(cache, 'get_many', wraps=cache.get_many) as get_many, \
+                patch.object(cache, 'set', wraps=cache.set) as set_:
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Event 0')
+        get_many.assert_called_once()
+        self.assertEqual(len(get_many.call_args.args[0]), 3)
+        # Every card was a hit: nothing re-rendered or written back
+        self.assertFalse([call for call in set_.call_args_list if call.args[0].startswith('fragment:')])
+
+    def test_keys_are_built_once_without_probing_storage(self):
+        self.client.get(reverse('home'))
+        with patch('core.templatetags.fragment_tags.event_fragment_key', wraps=event_fragment_key) as build, \
+                patch.object(default_storage, 'exists') as exists:
+            self.client.get(reverse('home'))
+        self.assertEqual(build.call_count, 3)
+        exists.assert_not_called()
+
+    def test_rsvp_changes_only_that_card(self):
+        event = self.events[0]
+        self.client.get(reverse('home'))
+        add_participants(event, 2)
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Participants: 2')
+        self.assertContains(response, 'Participants: 0', count=2)
+
+    def test_category_rename_invalidates_cards(self):
+        original = self.category.name
+        self.assertContains(self.client.get(reverse('home')), original)
+        self.category.name = 'Renamed'
+        self.category.save()
+        self.assertNotContains(self.client.get(reverse('home')), original)
+
+    def test_rsvp_button_stays_per_user(self):
+        self.assertContains(self.client.get(reverse('home')), 'Login to RSVP', count=3)
+        self.client.force_login(self.participant)
+        response = self.client.get(reverse('home'))
+        self.assertNotContains(response, 'Login to RSVP')
+        self.assertContains(response, reverse('rsvp_event', args=[self.events[0].id]))
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        cls.events = make_events(3, cls.category, days=1)
+        add_participants(cls.events[0], 2)
+        cls.admin = make_role_user('admin', 'Admin')
+        cls.organizer = make_role_user('organizer', 'Organizer')
+        cls.participant = make_role_user('participant', 'Participant')
+
+    def setUp(self):
+        registry.reset()
+
+    # (sync name, async name, user, query, text the async page must show)
+    PAGES = (
+        ('home', 'async_home', 'participant', {}, 'Event 0'),
+        ('event_list', 'async_event_list', 'organizer', {}, 'Event 0'),
+        ('admin_dashboard', 'async_admin_dashboard', 'admin', {'q': 'org'}, 'organizer@example.com'),
+        ('organizer_dashboard', 'async_organizer_dashboard', 'organizer', {'filter': 'upcoming'}, 'Event 0'),
+        ('participant_dashboard', 'async_participant_dashboard', 'participant', {}, 'Event 0'),
+    )
+
+    async def test_async_pages_match_sync_pages(self):
+        for sync_name, async_name, username, query, text in self.PAGES:
+            user = getattr(self, username)
+            await self.async_client.aforce_login(user)
+            await sync_to_async(self.client.force_login)(user)
+            with self.subTest(page=async_name):
+                expected = await sync_to_async(self.client.get)(reverse(sync_name), {**query, 'format': 'json'})
+                response = await self.async_client.get(reverse(async_name), {**query, 'format': 'json'})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+
+                response = await self.async_client.get(reverse(async_name), query)
+                self.assertContains(response, text)
+
+    async def test_event_details_shows_attendees(self):
+        await self.async_client.aforce_login(self.participant)
+        response = await self.async_client.get(reverse('async_event_details', args=[self.events[0].id]))
+        self.assertContains(response, self.events[0].name)
+        self.assertContains(response, 'attendee0')
+        response = await self.async_client.get(reverse('async_event_details', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_access_checks(self):
+        response = await self.async_client.get(reverse('async_event_list'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('sign_in'), response.url)
+        await self.async_client.aforce_login(self.participant)
+        response = await self.async_client.get(reverse('async_admin_dashboard'))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_async_requests_are_recorded(self):
+        await self.async_client.aforce_login(self.participant)
+        await self.async_client.get(reverse('async_home'))
+        summary = registry.summary()['async_home']
+        self.assertEqual(summary['request_seconds']['count'], 1)
+        self.assertGreater(summary['db_queries']['sum'], 0)
+        self.assertGreater(summary['template_seconds']['sum'], 0)
@@ -1,63 +1,145 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from django.utils.timezone import now
-from datetime import datetime
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Value, BooleanField
 from events.models import Event, Category
 from django.contrib import messages
+from core.cache import aget_or_build, get_or_build
+from core.pagination import akeyset_paginate, keyset_paginate
+from core.queries import alist
+from events.filters import EventFilters
+from django.http import HttpResponse, JsonResponse
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.utils.crypto import constant_time_compare
+from core.metrics import registry
+from users.roles import aget_request_user
 
-def home(request):
-    events_query = Event.objects.filter(date__gte=now().date()).select_related('category').order_by('date')
-
-    search_keyword = request.GET.get('search')
-    start_date2 = request.GET.get('start_date')
-    end_date2 = request.GET.get('end_date')
-
-    datefilter = False
-
-    if start_date2 and end_date2:
-        try:
-            start = datetime.strptime(start_date2, '%d/%m/%Y').date()
-            end = datetime.strptime(end_date2, '%d/%m/%Y').date()
-            if start <= end:
-                events_query = events_query.filter(date__range=(start, end))
-                datefilter = True
-            else:
-                 messages.error(request, "Error: The end date cannot be before the start date.")
-
-        except ValueError:
-            messages.error(request, "Error: Invalid date format. Please use DD/MM/YYYY.")
-
-    if search_keyword:
-        events_query = events_query.filter(Q(name__icontains=search_keyword) | Q(location__icontains=search_keyword))
-
-    category_id = request.GET.get('category')
-
-    if category_id:
-        events_query = events_query.filter(category__id=category_id)
-
-    if search_keyword or category_id or datefilter:
-        filtered_events = events_query.prefetch_related('participants')
-    else:
-        filtered_events = events_query[:12].prefetch_related('participants')
-
-    categories = Category.objects.all()
-    total_events = Event.objects.count()
-    total_upcoming = Event.objects.filter(date__gte=now().date()).count()
-    featured_event = events_query.first() 
-    
-    context = {
+HOME_PAGE_SIZE = 12
+
+
+def annotate_rsvped(queryset, user):
+    # One EXISTS probe per listed event instead of loading every participant
+    if not user.is_authenticated:
+        return queryset.annotate(is_rsvped=Value(False, output_field=BooleanField()))
+    rsvps = Event.participants.through.objects.filter(event_id=OuterRef('pk'), customuser_id=user.pk)
+    return queryset.annotate(is_rsvped=Exists(rsvps))
+
+
+def upcoming_events():
+    return Event.objects.filter(date__gte=now().date()).select_related('category').order_by('date', 'time', 'id')
+
+
+def home_filters(request):
+    filters = EventFilters(request.GET)
+    for error in filters.errors:
+        messages.error(request, error)
+    return filters
+
+
+def home_json(filtered_events):
+    return JsonResponse({
+        'results': [
+            {
+                'id': event.id,
+                'name': event.name,
+                'date': event.date,
+                'time': event.time,
+                'location': event.location,
+                'category_name': event.category.name,
+                'participant_count': event.participant_count,
+                'is_rsvped': event.is_rsvped,
+            }
+            for event in filtered_events
+        ],
+        'next': filtered_events.next_cursor,
+        'previous': filtered_events.prev_cursor,
+    })
+
+
+def home_context(filters, filtered_events, stats, results):
+    return {
         'filtered_events': filtered_events,
-        'categories': categories,
-        'total_events': total_events,
-        'total_results': filtered_events.count(),
-        'total_upcoming': total_upcoming,
-        'search_keyword': search_keyword,
-        'category_id': category_id,
-        'featured_event': featured_event,
-        'start_date': start_date2, 
-        'end_date': end_date2,
+        'categories': stats['categories'],
+        'total_events': stats['total_events'],
+        'page': filtered_events,
+        'total_results': results['total_results'],
+        'total_upcoming': stats['total_upcoming'],
+        'search_keyword': filters.search,
+        'category_id': filters.category_id,
+        'featured_event': results['featured_event'],
+        'start_date': filters.start_date,
+        'end_date': filters.end_date,
     }
-    return render(request, 'home.html', context)
+
+
+def home(request):
+    filters = home_filters(request)
+    events_query = filters.apply(upcoming_events())
+    filtered_events = keyset_paginate(
+        annotate_rsvped(events_query, request.user), filters.ordering(),
+        request.GET.get('cursor'), HOME_PAGE_SIZE,
+    )
+    if request.GET.get('format') == 'json':
+        return home_json(filtered_events)
+
+    stats = get_or_build('home_stats', lambda: {
+        'categories': list(Category.objects.all()),
+        'total_events': Event.objects.count(),
+        'total_upcoming': Event.objects.filter(date__gte=now().date()).count(),
+    })
+    results = get_or_build('home_results', lambda: {
+        'featured_event': events_query.first(),
+        'total_results': events_query.count() if filters.active else stats['total_upcoming'],
+    }, *filters.key)
+    return render(request, 'home.html', home_context(filters, filtered_events, stats, results))
+
+
+# Async home: same page, with the page query and the cached statistics fetched concurrently
+async def ahome(request):
+    user = await aget_request_user(request)
+    filters = home_filters(request)
+    events_query = filters.apply(upcoming_events())
+    paginate = akeyset_paginate(
+        annotate_rsvped(events_query, user), filters.ordering(),
+        request.GET.get('cursor'), HOME_PAGE_SIZE,
+    )
+    if request.GET.get('format') == 'json':
+        return home_json(await paginate)
+
+    async def build_stats():
+        categories, total_events, total_upcoming = await asyncio.gather(
+            alist(Category.objects.all()),
+            Event.objects.acount(),
+            Event.objects.filter(date__gte=now().date()).acount(),
+        )
+        return {'categories': categories, 'total_events': total_events, 'total_upcoming': total_upcoming}
+
+    filtered_events, stats = await asyncio.gather(paginate, aget_or_build('home_stats', build_stats))
+
+    async def build_results():
+        if not filters.active:
+            return {'featured_event': await events_query.afirst(), 'total_results': stats['total_upcoming']}
+        featured_event, total_results = await asyncio.gather(events_query.afirst(), events_query.acount())
+        return {'featured_event': featured_event, 'total_results': total_results}
+
+    results = await aget_or_build('home_results', build_results, *filters.key)
+    # Rendering (context processors included) stays sync and runs on the request's ORM thread
+    return await sync_to_async(render)(request, 'home.html', home_context(filters, filtered_events, stats, results))
 
 def no_permission(request):
-    return render(request, 'no_permission.html')
\ No newline at end of file
+    return render(request, 'no_permission.html')
+
+
+# Metrics: staff sessions, or a scraper presenting METRICS_TOKEN as a bearer token
+def metrics(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    bearer = credentials if scheme == 'Bearer' else ''
+    if not (request.user.is_staff or (token and constant_time_compare(bearer, token))):
+        raise PermissionDenied
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'views': registry.summary()})
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
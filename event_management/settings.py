@@ -25,7 +25,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = config('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = config('DEBUG', default=True, cast=bool)
+
+# debug_toolbar is a development tool only; it is never installed with DEBUG off
+DEBUG_TOOLBAR = DEBUG and config('DEBUG_TOOLBAR', default=True, cast=bool)
 
 ALLOWED_HOSTS = ['*']
 
@@ -45,10 +48,11 @@ INSTALLED_APPS = [
     'events.apps.EventsConfig',
     'users.apps.UsersConfig',
     'core',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.QueryLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,9 +60,12 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS += ['debug_toolbar']
+    MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
 INTERNAL_IPS = [
     # ...
     "127.0.0.1",
@@ -78,6 +85,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'users.context_processors.roles',
             ],
         },
     },
@@ -104,6 +112,48 @@ DATABASES = {
     )
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Take the write lock when a transaction starts and wait for it, so concurrent RSVPs queue up
+    # instead of failing with "database is locked". It has to be connection-wide: a deferred transaction
+    # that upgrades from read to write gets SQLITE_BUSY at once, without honouring the timeout. Plain
+    # reads run in autocommit and are unaffected; only atomic blocks are serialized.
+    DATABASES['default'].setdefault('OPTIONS', {}).update({'transaction_mode': 'IMMEDIATE', 'timeout': 20})
+    # A file-backed test database gives threaded tests real SQLite locking instead of shared-cache table locks
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / '.cache')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': config('CACHE_LOCATION', default='django_cache'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[config('CACHE_BACKEND', default='locmem')],
+}
+
+STATS_CACHE_ALIAS = 'default'
+STATS_CACHE_TIMEOUT = config('STATS_CACHE_TIMEOUT', default=300, cast=int)
+
+# Role versions must be seen by every worker; on locmem roles are read from the database on each request
+# instead of trusting the session copy
+ROLES_CACHE_ALIAS = 'default'
+
+# Rendered event cards; stale keys are never read again, so the timeout only bounds memory
+FRAGMENT_CACHE_ALIAS = 'default'
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=3600, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -163,4 +213,46 @@ DEFAULT_FROM_EMAIL = config('EMAIL_HOST_USER')
 LOGIN_URL = 'sign_in'
 
 
-FRONTEND_URL = config('FRONTEND_URL')
\ No newline at end of file
+FRONTEND_URL = config('FRONTEND_URL')
+
+# Dotted path to an events.search backend; empty picks one for the database vendor
+EVENT_SEARCH_BACKEND = config('EVENT_SEARCH_BACKEND', default='')
+
+# Background threads resizing uploaded images (core.images)
+IMAGE_DERIVATIVE_WORKERS = config('IMAGE_DERIVATIVE_WORKERS', default=2, cast=int)
+
+# Per-view timing histograms (core.middleware.ProfilingMiddleware), served at /metrics/
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+# Profile 1 in N requests with cProfile and write .prof files to PROFILING_DUMP_DIR; 0 disables sampling
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0, cast=int)
+PROFILING_DUMP_DIR = config('PROFILING_DUMP_DIR', default=str(BASE_DIR / '.cache' / 'profiles'))
+# Lets a Prometheus scraper read /metrics/ with "Authorization: Bearer <token>"; staff sessions always can
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Query log (core.middleware.QueryLogMiddleware): queries slower than SLOW_QUERY_MS, and SQL run
+# DUPLICATE_QUERY_THRESHOLD or more times in one request, are written as JSON lines; 0 disables either check
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=200, cast=int)
+DUPLICATE_QUERY_THRESHOLD = config('DUPLICATE_QUERY_THRESHOLD', default=5, cast=int)
+QUERY_LOG_FILE = config('QUERY_LOG_FILE', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_lines': {'()': 'core.querylog.JsonLinesFormatter'},
+    },
+    'handlers': {
+        'query_log': (
+            {'class': 'logging.FileHandler', 'filename': QUERY_LOG_FILE, 'formatter': 'json_lines'}
+            if QUERY_LOG_FILE else
+            {'class': 'logging.StreamHandler', 'formatter': 'json_lines'}
+        ),
+    },
+    'loggers': {
+        'core.querylog': {
+            'handlers': ['query_log'],
+            'level': config('QUERY_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+    },
+}
@@ -16,17 +16,22 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from debug_toolbar.toolbar import debug_toolbar_urls
-from core.views import home, no_permission
+from core.views import ahome, home, metrics, no_permission
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('',home, name='home'),
+    path('async/', ahome, name='async_home'),
     path('no_permission/', no_permission, name='no_permission'),
+    path('metrics/', metrics, name='metrics'),
     path("users/", include("users.urls")),
     path("events/", include("events.urls"))
-]+ debug_toolbar_urls()
+]
+
+if settings.DEBUG_TOOLBAR:
+    from debug_toolbar.toolbar import debug_toolbar_urls
+    urlpatterns += debug_toolbar_urls()
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
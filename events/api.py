@@ -0,0 +1,89 @@
+from django.core.files.storage import default_storage
+from django.db.models import Count, F
+from django.http import Http404, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from core.cache import get_cache, is_process_local, stats_version
+from core.pagination import keyset_paginate, parse_ordering
+from events.filters import EventFilters
+from events.models import Category, Event
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+EVENT_API_FIELDS = (
+    'id', 'name', 'date', 'time', 'location', 'category_id', 'participant_count', 'capacity', 'updated_at',
+)
+EVENT_DETAIL_API_FIELDS = EVENT_API_FIELDS + ('description', 'image')
+CATEGORY_API_FIELDS = ('id', 'name', 'description', 'updated_at')
+
+
+# Conditional GET: the stats version (core.cache) is bumped by every Event/Category write and RSVP change,
+# so it doubles as the ETag without touching the database. Only an ETag is offered: RSVPs and deletes
+# change what is served without moving any updated_at, so a Last-Modified date would give stale 304s.
+def api_etag(request, *args, **kwargs):
+    # A per-process version misses other workers' bumps: serve no ETag rather than a stale one
+    if is_process_local(get_cache()):
+        return None
+    return str(stats_version())
+
+
+def api_view(view):
+    # Clients and shared caches may keep responses but must revalidate; unchanged data costs a 304
+    view = condition(etag_func=api_etag)(view)
+    view = cache_control(public=True, max_age=0, must_revalidate=True)(view)
+    return require_GET(view)
+
+
+def page_size(request):
+    size = request.GET.get('page_size', '')
+    return min(int(size), API_MAX_PAGE_SIZE) if size.isdigit() and int(size) > 0 else API_PAGE_SIZE
+
+
+def event_values(queryset, fields, *extra):
+    # Flat dicts straight from the cursor: no model instances, category name joined in the same query
+    return queryset.values(*fields, *extra, category_name=F('category__name'))
+
+
+def image_url(name):
+    return default_storage.url(name) if name else None
+
+
+# Events
+@api_view
+def event_list(request):
+    filters = EventFilters(request.GET)
+    if filters.errors:
+        return JsonResponse({'errors': filters.errors}, status=400)
+    ordering = filters.ordering()
+    # Ordering fields (e.g. search_rank) are selected too, since the cursor is built from them
+    extra = [field for field, _ in parse_ordering(ordering) if field not in EVENT_API_FIELDS]
+    page = keyset_paginate(
+        event_values(filters.apply(Event.objects.all()), EVENT_API_FIELDS, *extra),
+        ordering, request.GET.get('cursor'), page_size(request),
+    )
+    for row in page:
+        for field in extra:
+            del row[field]
+    return JsonResponse({
+        'results': page.object_list,
+        'next': page.next_cursor,
+        'previous': page.prev_cursor,
+    })
+
+
+@api_view
+def event_detail(request, id):
+    event = event_values(Event.objects.filter(id=id), EVENT_DETAIL_API_FIELDS).first()
+    if event is None:
+        raise Http404("Event not found")
+    event['image'] = image_url(event['image'])
+    return JsonResponse(event)
+
+
+# Categories
+@api_view
+def category_list(request):
+    categories = Category.objects.order_by('name', 'id').values(*CATEGORY_API_FIELDS, event_count=Count('events'))
+    return JsonResponse({'results': list(categories)})
@@ -0,0 +1,36 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.cache import bump_stats_version
+from events.models import Event
+
+Participation = Event.participants.through
+
+
+def participant_count_subquery():
+    counts = (
+        Participation.objects
+        .filter(event_id=OuterRef('pk'))
+        .order_by()
+        .values('event_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def adjust_participant_count(event_ids, delta):
+    return Event.objects.filter(pk__in=event_ids).update(participant_count=F('participant_count') + delta)
+
+
+def recount_participants(event_ids=None):
+    # Returns the number of events whose stored counter had drifted from the through table
+    events = Event.objects.all()
+    if event_ids is not None:
+        events = events.filter(pk__in=event_ids)
+    drifted = events.annotate(actual=participant_count_subquery()).exclude(participant_count=F('actual'))
+    drifted_ids = list(drifted.values_list('pk', flat=True))
+    Event.objects.filter(pk__in=drifted_ids).update(participant_count=participant_count_subquery())
+    if drifted_ids:
+        bump_stats_version()
+    return len(drifted_ids)
@@ -0,0 +1,44 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    # csv.writer target that hands each formatted line straight back instead of buffering it
+    def write(self, value):
+        return value
+
+
+def csv_lines(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(header, rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row))) + '\n'
+
+
+def export_response(header, queryset, export_format, filename):
+    # values_list + iterator keeps memory flat: rows are fetched CHUNK_SIZE at a time and never cached
+    rows = queryset.values_list(*header.values()).iterator(chunk_size=CHUNK_SIZE)
+    columns = list(header)
+    lines = ndjson_lines(columns, rows) if export_format == 'ndjson' else csv_lines(columns, rows)
+    response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES.get(export_format, 'text/csv'))
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+def export_format(request):
+    return request.GET.get('format') if request.GET.get('format') in CONTENT_TYPES else 'csv'
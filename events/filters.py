@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from events.search import get_search_backend
+
+DATE_FORMAT = '%d/%m/%Y'
+
+
+# The keyword / category / date-range filters behind the home page search, shared with the exports
+class EventFilters:
+    def __init__(self, params):
+        self.search = params.get('search')
+        self.category_id = params.get('category')
+        self.start_date = params.get('start_date')
+        self.end_date = params.get('end_date')
+        self.errors = []
+        self.date_range = None
+
+        if self.start_date and self.end_date:
+            try:
+                start = datetime.strptime(self.start_date, DATE_FORMAT).date()
+                end = datetime.strptime(self.end_date, DATE_FORMAT).date()
+                if start <= end:
+                    self.date_range = (start, end)
+                else:
+                    self.errors.append("Error: The end date cannot be before the start date.")
+            except ValueError:
+                self.errors.append("Error: Invalid date format. Please use DD/MM/YYYY.")
+
+        if self.category_id and not self.category_id.isdigit():
+            self.category_id = None
+
+    @property
+    def active(self):
+        return bool(self.search or self.category_id or self.date_range)
+
+    @property
+    def key(self):
+        return (self.search, self.category_id, self.date_range) if self.active else ()
+
+    def ordering(self, ordering=('date', 'time', 'id')):
+        if self.search:
+            return get_search_backend().rank_ordering + tuple(ordering)
+        return tuple(ordering)
+
+    def apply(self, queryset):
+        if self.date_range:
+            queryset = queryset.filter(date__range=self.date_range)
+        if self.search:
+            queryset = get_search_backend().search(queryset, self.search)
+        if self.category_id:
+            queryset = queryset.filter(category__id=self.category_id)
+        return queryset
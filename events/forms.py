@@ -1,5 +1,9 @@
 from django import forms
+from django.contrib.auth import get_user_model
 from events.models import Event, Category
+from core.images import schedule_derivatives
+
+User = get_user_model()
 
 
 class StyledFormMixin:
@@ -37,6 +41,19 @@ class StyledFormMixin:
                 })
 
 
+class ImageDerivativesMixin:
+    image_fields = ()
+
+    def save(self, commit=True):
+        instance = super().save(commit)
+        if commit:
+            for field_name in self.image_fields:
+                image = getattr(instance, field_name)
+                if field_name in self.changed_data and image:
+                    schedule_derivatives(image.name)
+        return instance
+
+
 class CategoryForm(StyledFormMixin, forms.ModelForm):
     class Meta:
         model = Category
@@ -46,10 +63,12 @@ class CategoryForm(StyledFormMixin, forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.apply_styled_widgets()
 
-class EventForm(StyledFormMixin, forms.ModelForm):
+class EventForm(ImageDerivativesMixin, StyledFormMixin, forms.ModelForm):
+    image_fields = ('image',)
+
     class Meta:
         model = Event
-        fields = ['name', 'description', 'date', 'time', 'location', 'category', 'image', 'participants']
+        fields = ['name', 'description', 'date', 'time', 'location', 'capacity', 'category', 'image']
         widgets = {
             'category': forms.Select,
             'date': forms.SelectDateWidget,
@@ -58,4 +77,53 @@ class EventForm(StyledFormMixin, forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.apply_styled_widgets()
\ No newline at end of file
+        self.apply_styled_widgets()
+
+
+# Participant picker: options come from the paginated user lookup endpoint, never from the form itself
+class UserPickerWidget(forms.Widget):
+    template_name = 'widgets/user_picker.html'
+
+    def __init__(self, lookup_url='', attrs=None):
+        super().__init__(attrs)
+        self.lookup_url = lookup_url
+
+    def value_from_datadict(self, data, files, name):
+        return data.getlist(name) if hasattr(data, 'getlist') else data.get(name, [])
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        ids = [int(pk) for pk in value or [] if str(pk).isdigit()]
+        # Only the users already picked (e.g. when a submitted form is re-rendered) are loaded
+        context['widget'].update({
+            'lookup_url': self.lookup_url,
+            'selected': User.objects.filter(pk__in=ids).only('username').order_by('username') if ids else [],
+        })
+        return context
+
+
+class UserIdsField(forms.Field):
+    widget = UserPickerWidget
+
+    def to_python(self, value):
+        try:
+            return sorted({int(pk) for pk in value or []})
+        except (TypeError, ValueError):
+            raise forms.ValidationError("Invalid user selection.")
+
+    def validate(self, value):
+        super().validate(value)
+        found = set(User.objects.filter(pk__in=value).values_list('pk', flat=True)) if value else set()
+        if len(found) != len(value):
+            raise forms.ValidationError("Some of the selected users no longer exist.")
+
+
+class AttendeesForm(forms.Form):
+    add = UserIdsField(required=False, label="Add attendees")
+    remove = UserIdsField(required=False, label="Remove attendees")
+
+    def __init__(self, *args, lookup_url='', event_id=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['add'].widget.lookup_url = lookup_url
+        # Removal searches the event's own attendees only
+        self.fields['remove'].widget.lookup_url = f"{lookup_url}?event={event_id}"
@@ -0,0 +1,182 @@
+import csv
+import json
+import re
+from datetime import date, time
+
+from django import forms
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxLengthValidator, ProhibitNullCharactersValidator
+from django.db import transaction
+
+from core.cache import bump_stats_version
+from events.forms import EventForm
+from events.models import Category, Event
+from events.rsvp import insert_participations
+from events.search import get_search_backend
+
+User = get_user_model()
+
+VALIDATED_FIELDS = ('name', 'description', 'date', 'time', 'location')
+
+# ISO values skip the form's locale-aware strptime loop; anything else still goes through field.clean()
+FAST_PARSERS = {
+    'date': (re.compile(r'\d{4}-\d{2}-\d{2}$'), date.fromisoformat),
+    'time': (re.compile(r'\d{2}:\d{2}(:\d{2}(\.\d{1,6})?)?$'), time.fromisoformat),
+}
+
+
+def plain_text_field(field):
+    # Stripped text with at most a length limit and no NUL characters: checked inline, errors still via clean()
+    return (
+        type(field) is forms.CharField and field.strip and field.min_length is None
+        and all(isinstance(v, (MaxLengthValidator, ProhibitNullCharactersValidator)) for v in field.validators)
+    )
+
+
+# Readers: both yield (line number, row dict) without loading the file
+def read_csv(handle):
+    reader = csv.DictReader(handle)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson(handle):
+    for line_number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            row = {'__error__': f"Invalid JSON: {e}"}
+        yield line_number, row if isinstance(row, dict) else {'__error__': "Expected a JSON object"}
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+def split_participants(value):
+    if isinstance(value, list):
+        return [str(username).strip() for username in value if str(username).strip()]
+    return [username.strip() for username in (value or '').split(';') if username.strip()]
+
+
+class EventImporter:
+    def __init__(self, batch_size=2000, on_error=None, on_progress=None):
+        self.batch_size = batch_size
+        self.on_error = on_error or (lambda line_number, errors: None)
+        self.on_progress = on_progress or (lambda importer: None)
+        # EventForm's own field instances, so imported rows obey the same rules as the create form
+        form = EventForm()
+        self.fields = {name: form.fields[name] for name in VALIDATED_FIELDS}
+        self.text_fields = {name for name, field in self.fields.items() if plain_text_field(field)}
+        # On duplicate names the oldest category wins, matching the first row a lookup would return
+        self.categories = dict(Category.objects.order_by('-id').values_list('name', 'id'))
+        self.users = {}
+        self.created = 0
+        self.failed = 0
+        self.rsvps = 0
+        self.search_backend = get_search_backend()
+
+    def validate(self, row):
+        if '__error__' in row:
+            return None, {'row': [row['__error__']]}
+        cleaned, errors = {}, {}
+        for name, field in self.fields.items():
+            try:
+                cleaned[name] = self.clean_field(name, field, row.get(name))
+            except ValidationError as e:
+                errors[name] = e.messages
+        category = (row.get('category') or '').strip()
+        if not category:
+            errors['category'] = ["This field is required."]
+        elif len(category) > Category._meta.get_field('name').max_length:
+            errors['category'] = ["Category name is too long."]
+        cleaned['category'] = category
+        cleaned['image'] = row.get('image') or Event._meta.get_field('image').default
+        cleaned['participants'] = split_participants(row.get('participants'))
+        return cleaned, errors
+
+    def clean_field(self, name, field, value):
+        if name in self.text_fields and isinstance(value, str):
+            text = value.strip()
+            if text and '\x00' not in text and (field.max_length is None or len(text) <= field.max_length):
+                return text
+            return field.clean(value)
+        fast = FAST_PARSERS.get(name)
+        if fast and isinstance(value, str) and fast[0].match(value):
+            try:
+                parsed = fast[1](value)
+            except ValueError:
+                return field.clean(value)
+            field.validate(parsed)
+            field.run_validators(parsed)
+            return parsed
+        return field.clean(value)
+
+    def run(self, rows):
+        batch = []
+        for line_number, row in rows:
+            cleaned, errors = self.validate(row)
+            if errors:
+                self.failed += 1
+                self.on_error(line_number, errors)
+                continue
+            batch.append((line_number, cleaned))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        bump_stats_version()
+
+    def resolve_categories(self, batch):
+        missing = {cleaned['category'] for _, cleaned in batch} - self.categories.keys()
+        if missing:
+            created = Category.objects.bulk_create([Category(name=name) for name in sorted(missing)])
+            self.categories.update((category.name, category.id) for category in created)
+
+    def resolve_users(self, batch):
+        missing = {username for _, cleaned in batch for username in cleaned['participants']} - self.users.keys()
+        if missing:
+            self.users.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
+
+    def flush(self, batch):
+        with transaction.atomic():
+            self.resolve_categories(batch)
+            self.resolve_users(batch)
+
+            events, attendees = [], []
+            for line_number, cleaned in batch:
+                usernames = cleaned['participants']
+                user_ids = {self.users[username] for username in usernames if username in self.users}
+                unknown = [username for username in usernames if username not in self.users]
+                if unknown:
+                    self.on_error(line_number, {'participants': [f"Unknown users skipped: {', '.join(unknown)}"]})
+                events.append(Event(
+                    name=cleaned['name'],
+                    description=cleaned['description'],
+                    date=cleaned['date'],
+                    time=cleaned['time'],
+                    location=cleaned['location'],
+                    category_id=self.categories[cleaned['category']],
+                    image=cleaned['image'],
+                    participant_count=len(user_ids),
+                ))
+                attendees.append(user_ids)
+
+            # bulk_create returns primary keys on PostgreSQL and SQLite, needed for the RSVP rows below
+            event_ids = [event.pk for event in Event.objects.bulk_create(events, batch_size=self.batch_size)]
+            insert_participations(
+                [(event_id, user_id) for event_id, user_ids in zip(event_ids, attendees) for user_id in user_ids],
+                self.batch_size,
+            )
+            self.search_backend.add_events(event_ids)
+
+        self.created += len(event_ids)
+        self.rsvps += sum(len(user_ids) for user_ids in attendees)
+        self.on_progress(self)
@@ -0,0 +1,60 @@
+import csv
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.importers import READERS, EventImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import events from a CSV or NDJSON file. Columns: name, description, date (YYYY-MM-DD), "
+        "time (HH:MM), location, category (name, created if missing), optional image and participants "
+        "(semicolon-separated usernames, or a JSON list in NDJSON)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=sorted(READERS), help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--errors', help="Write rejected rows and warnings to this CSV file.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f"Unknown format '{file_format}', use --format {' or '.join(sorted(READERS))}")
+
+        error_file = open(options['errors'], 'w', newline='') if options['errors'] else None
+        error_writer = csv.writer(error_file) if error_file else None
+        if error_writer:
+            error_writer.writerow(['line', 'errors'])
+
+        def on_error(line_number, errors):
+            if error_writer:
+                error_writer.writerow([line_number, json.dumps(errors)])
+
+        started = time.monotonic()
+
+        def on_progress(importer):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{importer.created} imported, {importer.failed} rejected, "
+                f"{importer.created / elapsed if elapsed else 0:,.0f} rows/s"
+            )
+
+        importer = EventImporter(batch_size=options['batch_size'], on_error=on_error, on_progress=on_progress)
+        try:
+            with open(path, newline='', encoding='utf-8') as handle:
+                importer.run(READERS[file_format](handle))
+        finally:
+            if error_file:
+                error_file.close()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.created} events and {importer.rsvps} RSVPs in {elapsed:.1f}s, "
+            f"rejected {importer.failed} rows"
+        ))
@@ -0,0 +1,72 @@
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from events.importers import READERS
+from events.models import Event
+from events.rsvp import batched, bulk_add_participants
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk add RSVPs from a CSV or NDJSON file with an event_id column and a username or user_id column. "
+        "Existing RSVPs are skipped; no confirmation emails are queued unless --notify is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=sorted(READERS), help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--notify', action='store_true', help="Queue RSVP confirmation emails for new RSVPs.")
+
+    def pairs(self, rows, batch_size):
+        # Usernames and event ids are resolved one batch at a time, so memory stays flat on any file size
+        for batch in batched(rows, batch_size):
+            parsed = []
+            for line_number, row in batch:
+                event_id = str(row.get('event_id') or '').strip()
+                user_id = str(row.get('user_id') or '').strip()
+                username = str(row.get('username') or '').strip()
+                if not event_id.isdigit() or not (user_id.isdigit() or username):
+                    self.skipped += 1
+                    self.stderr.write(f"Line {line_number}: needs an event_id and a username or user_id")
+                    continue
+                parsed.append((line_number, int(event_id), int(user_id) if user_id.isdigit() else None, username))
+
+            events = set(Event.objects.filter(id__in={row[1] for row in parsed}).values_list('id', flat=True))
+            user_ids = set(User.objects.filter(id__in={row[2] for row in parsed if row[2]}).values_list('id', flat=True))
+            usernames = dict(User.objects.filter(
+                username__in={row[3] for row in parsed if row[2] is None}
+            ).values_list('username', 'id'))
+
+            for line_number, event_id, user_id, username in parsed:
+                user_id = user_id if user_id in user_ids else usernames.get(username)
+                if event_id not in events or user_id is None:
+                    self.skipped += 1
+                    self.stderr.write(f"Line {line_number}: unknown event or user")
+                    continue
+                yield event_id, user_id
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f"Unknown format '{file_format}', use --format {' or '.join(sorted(READERS))}")
+
+        self.skipped = 0
+        started = time.monotonic()
+        with open(path, newline='', encoding='utf-8') as handle:
+            added = bulk_add_participants(
+                self.pairs(READERS[file_format](handle), options['batch_size']),
+                batch_size=options['batch_size'],
+                notify=options['notify'],
+                on_progress=lambda added: self.stdout.write(f"{added} RSVPs added"),
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {added} RSVPs in {time.monotonic() - started:.1f}s, skipped {self.skipped} rows"
+        ))
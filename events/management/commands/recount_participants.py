@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from events.counters import recount_participants
+
+
+class Command(BaseCommand):
+    help = "Recompute Event.participant_count from the participants through table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help="Limit the repair to these events.")
+
+    def handle(self, *args, **options):
+        repaired = recount_participants(options['event_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f"Repaired participant count on {repaired} event(s)"))
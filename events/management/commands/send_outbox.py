@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.outbox import OutboxSender, claim_due_emails
+
+
+class Command(BaseCommand):
+    help = "Send queued RSVP emails from the outbox, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--base-delay', type=int, default=30, help="Seconds before the first retry.")
+        parser.add_argument('--max-delay', type=int, default=3600, help="Upper bound for the retry delay in seconds.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting once the outbox is drained.")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds to sleep between polls in --loop mode.")
+
+    def handle(self, *args, **options):
+        sender = OutboxSender(
+            workers=options['workers'],
+            base_delay=options['base_delay'],
+            max_delay=options['max_delay'],
+            max_attempts=options['max_attempts'],
+        )
+        total_sent = total_failed = 0
+        try:
+            while True:
+                emails = claim_due_emails(options['batch_size'])
+                if emails:
+                    sent, failed = sender.deliver(emails)
+                    total_sent += sent
+                    total_failed += failed
+                    self.stdout.write(f"Sent {sent}, failed {failed}")
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sender.close()
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained: {total_sent} sent, {total_failed} failed"))
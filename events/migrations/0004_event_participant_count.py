@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:11
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_participant_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Participation = Event.participants.through
+    counts = (
+        Participation.objects
+        .filter(event_id=OuterRef('pk'))
+        .order_by()
+        .values('event_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Event.objects.update(participant_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_participant_count, migrations.RunPython.noop),
+    ]
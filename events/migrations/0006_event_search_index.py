@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:20
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE events_event_fts USING fts5("
+    "name, location, description, category, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO events_event_fts (rowid, name, location, description, category) "
+    "SELECT e.id, e.name, e.location, e.description, c.name "
+    "FROM events_event e JOIN events_category c ON c.id = e.category_id",
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS events_event_fts",
+]
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE events_event ADD COLUMN search_vector tsvector",
+    "CREATE INDEX event_search_vector_gin ON events_event USING gin (search_vector)",
+    "UPDATE events_event e SET search_vector = "
+    "setweight(to_tsvector('english', coalesce(e.name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(c.name, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(e.location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(e.description, '')), 'C') "
+    "FROM events_category c WHERE c.id = e.category_id",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS event_search_vector_gin",
+    "ALTER TABLE events_event DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_for_vendor({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:00
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def marker_name(name):
+    # Frozen copy of core.images.marker_name as of this migration: the last derivative written for a set
+    return f'{name}.1024w.webp'
+
+
+def populate_image_derivatives_ready(apps, schema_editor):
+    # Sets backfilled before the flag existed: one storage check per distinct image
+    Event = apps.get_model('events', 'Event')
+    names = Event.objects.exclude(image='').exclude(image=None).values_list('image', flat=True).distinct()
+    ready = [name for name in names if default_storage.exists(marker_name(name))]
+    Event.objects.filter(image__in=ready).update(image_derivatives_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='image_derivatives_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(populate_image_derivatives_ready, migrations.RunPython.noop),
+    ]
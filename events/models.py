@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -20,11 +21,80 @@ class Event(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='events')
     image = models.ImageField(upload_to='event_images/', blank=True, null=True, default='event_images/default_img.jpg')
     participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='rsvp_events', blank=True)
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    capacity = models.PositiveIntegerField(blank=True, null=True, help_text="Leave empty for unlimited seats")
+    # Set once the image's derivative set is stored (see core.images), so renders never probe storage
+    image_derivatives_ready = models.BooleanField(default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['date', 'time']
+        indexes = [
+            models.Index(fields=['date', 'time', 'id'], name='event_date_time_id_idx'),
+            models.Index(fields=['category', 'date'], name='event_category_date_idx'),
+        ]
         
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    def save(self, *args, **kwargs):
+        # participant_count and image_derivatives_ready are maintained with queryset updates; a full save from a
+        # stale instance must not write their old values back
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('participant_count', 'image_derivatives_ready')
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def is_full(self):
+        return self.capacity is not None and self.participant_count >= self.capacity
+
+
+class WaitlistEntry(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='waitlist')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='waitlisted_events')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'user'], name='waitlist_event_user_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} waiting for {self.event}"
+
+
+class OutboxEmail(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=200)
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
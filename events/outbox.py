@@ -0,0 +1,134 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Event, OutboxEmail
+
+User = get_user_model()
+
+RSVP_SUBJECT = "RSVP Confirmation"
+
+
+# Enqueue
+def rsvp_email(user, event):
+    return OutboxEmail(
+        recipient=user.email,
+        subject=RSVP_SUBJECT,
+        message=f"Hi {user.username}, you have RSVPed to the event: {event.name}",
+    )
+
+
+def enqueue_rsvp_pairs(pairs):
+    # One confirmation per (event_id, user_id) pair, loading each event and user once
+    pairs = list(pairs)
+    if not pairs:
+        return 0
+    events = Event.objects.only('name').in_bulk({event_id for event_id, _ in pairs})
+    users = User.objects.exclude(email='').only('username', 'email').in_bulk({user_id for _, user_id in pairs})
+    emails = [
+        rsvp_email(users[user_id], events[event_id])
+        for event_id, user_id in pairs
+        if event_id in events and user_id in users
+    ]
+    OutboxEmail.objects.bulk_create(emails)
+    return len(emails)
+
+
+def enqueue_rsvp_emails(event_ids, user_ids):
+    # Only called with the newly added side of the relation
+    return enqueue_rsvp_pairs((event_id, user_id) for event_id in event_ids for user_id in user_ids)
+
+
+# Delivery
+def claim_due_emails(batch_size, lease=600):
+    # Claimed rows are leased: a worker that dies mid-batch leaves them SENDING until the lease expires
+    now = timezone.now()
+    with transaction.atomic():
+        due = (
+            OutboxEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=[OutboxEmail.PENDING, OutboxEmail.SENDING], next_attempt_at__lte=now)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        ids = list(due)
+        OutboxEmail.objects.filter(id__in=ids).update(
+            status=OutboxEmail.SENDING, next_attempt_at=now + timedelta(seconds=lease),
+        )
+    return list(OutboxEmail.objects.filter(id__in=ids))
+
+
+def retry_delay(attempts, base_delay, max_delay):
+    return timedelta(seconds=min(base_delay * 2 ** (attempts - 1), max_delay))
+
+
+class OutboxSender:
+    def __init__(self, workers=4, base_delay=30, max_delay=3600, max_attempts=5):
+        self.workers = workers
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    # Each worker thread opens its SMTP connection once and reuses it for every message it sends
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _send(self, email):
+        try:
+            EmailMessage(
+                email.subject, email.message, settings.DEFAULT_FROM_EMAIL, [email.recipient],
+                connection=self._connection(),
+            ).send()
+            return email, None
+        except Exception as e:
+            # Drop the broken connection so the next message reconnects
+            connection = getattr(self._local, 'connection', None)
+            if connection is not None:
+                connection.close()
+                self._local.connection = None
+            return email, str(e)
+
+    def deliver(self, emails):
+        results = list(self._pool.map(self._send, emails))
+
+        now = timezone.now()
+        for email, error in results:
+            email.attempts += 1
+            if error is None:
+                email.status = OutboxEmail.SENT
+                email.sent_at = now
+                email.last_error = ''
+            else:
+                email.last_error = error
+                if email.attempts >= self.max_attempts:
+                    email.status = OutboxEmail.FAILED
+                else:
+                    email.status = OutboxEmail.PENDING
+                    email.next_attempt_at = now + retry_delay(email.attempts, self.base_delay, self.max_delay)
+        OutboxEmail.objects.bulk_update(
+            [email for email, _ in results],
+            ['status', 'attempts', 'sent_at', 'last_error', 'next_attempt_at'],
+        )
+        return sum(1 for _, error in results if error is None), sum(1 for _, error in results if error)
+
+    def close(self):
+        self._pool.shutdown()
+        for connection in self._connections:
+            connection.close()
+        self._connections.clear()
@@ -0,0 +1,151 @@
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from core.cache import bump_stats_version
+from events.counters import Participation, adjust_participant_count, recount_participants
+from events.models import Event, WaitlistEntry
+from events.outbox import enqueue_rsvp_pairs
+
+CONFIRMED = 'confirmed'
+ALREADY_RSVPED = 'already_rsvped'
+WAITLISTED = 'waitlisted'
+ALREADY_WAITLISTED = 'already_waitlisted'
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def existing_pairs(pairs, chunk_size=500):
+    # Match the exact pairs rather than the events x users cross product, which can be far larger
+    found = set()
+    for chunk in batched(pairs, chunk_size):
+        users_by_event = {}
+        for event_id, user_id in chunk:
+            users_by_event.setdefault(event_id, set()).add(user_id)
+        condition = Q()
+        for event_id, user_ids in users_by_event.items():
+            condition |= Q(event_id=event_id, customuser_id__in=user_ids)
+        found.update(Participation.objects.filter(condition).values_list('event_id', 'customuser_id'))
+    return found
+
+
+def insert_participations(pairs, batch_size=5000):
+    # Straight into the through table: no m2m_changed, so callers own counters and notifications
+    Participation.objects.bulk_create(
+        [Participation(event_id=event_id, customuser_id=user_id) for event_id, user_id in pairs],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+
+# Bulk RSVP
+def bulk_add_participants(pairs, batch_size=5000, notify=False, on_progress=None):
+    # pairs is any iterable of (event_id, user_id); only one batch is held in memory at a time
+    touched_events = set()
+    added = 0
+    for batch in batched(pairs, batch_size):
+        batch = set(batch)
+        with transaction.atomic():
+            new_pairs = batch - existing_pairs(batch)
+            insert_participations(new_pairs, batch_size)
+            if notify:
+                enqueue_rsvp_pairs(new_pairs)
+        touched_events.update(event_id for event_id, _ in new_pairs)
+        added += len(new_pairs)
+        if on_progress:
+            on_progress(added)
+
+    # Derived counters are recomputed once per touched event, not once per row
+    for event_ids in batched(sorted(touched_events), batch_size):
+        recount_participants(event_ids)
+    if added:
+        bump_stats_version()
+    return added
+
+
+def bulk_remove_participants(event_id, user_ids):
+    with transaction.atomic():
+        removed, _ = Participation.objects.filter(event_id=event_id, customuser_id__in=user_ids).delete()
+        if removed:
+            adjust_participant_count([event_id], -removed)
+    if removed:
+        promote_waitlist(event_id)
+        bump_stats_version()
+    return removed
+
+
+def apply_attendee_diff(event_id, add_ids, remove_ids):
+    # Organizer edits: additions are not held to capacity, and only newly added users get a confirmation
+    remove_ids = set(remove_ids) - set(add_ids)
+    removed = bulk_remove_participants(event_id, remove_ids) if remove_ids else 0
+    added = bulk_add_participants(((event_id, user_id) for user_id in add_ids), notify=True)
+    return added, removed
+
+
+# Single RSVP: the seat is taken with one conditional UPDATE, so concurrent requests can never overbook
+def reserve_seat(event_id):
+    seats = Event.objects.filter(id=event_id).filter(
+        Q(capacity__isnull=True) | Q(participant_count__lt=F('capacity'))
+    )
+    return seats.update(participant_count=F('participant_count') + 1) == 1
+
+
+def link_participant(event_id, user_id):
+    # The through table's unique (event, user) constraint makes this idempotent
+    try:
+        with transaction.atomic():
+            Participation.objects.create(event_id=event_id, customuser_id=user_id)
+    except IntegrityError:
+        return False
+    return True
+
+
+def rsvp(event_id, user):
+    # Raises Event.DoesNotExist for unknown events; otherwise returns one of the status constants above
+    with transaction.atomic():
+        if reserve_seat(event_id):
+            if not link_participant(event_id, user.id):
+                adjust_participant_count([event_id], -1)
+                return ALREADY_RSVPED
+            enqueue_rsvp_pairs([(event_id, user.id)])
+            status = CONFIRMED
+        else:
+            status = join_waitlist(event_id, user)
+    bump_stats_version()
+    return status
+
+
+def join_waitlist(event_id, user):
+    if not Event.objects.filter(id=event_id).exists():
+        raise Event.DoesNotExist(f"Event {event_id} does not exist")
+    if Participation.objects.filter(event_id=event_id, customuser_id=user.id).exists():
+        return ALREADY_RSVPED
+    _, created = WaitlistEntry.objects.get_or_create(event_id=event_id, user_id=user.id)
+    return WAITLISTED if created else ALREADY_WAITLISTED
+
+
+def promote_waitlist(event_id):
+    # Fill freed seats first-come first-served; stops as soon as the event is full or nobody is waiting
+    promoted = 0
+    while True:
+        with transaction.atomic():
+            entry = (
+                WaitlistEntry.objects.select_for_update(skip_locked=True)
+                .filter(event_id=event_id).order_by('created_at', 'id').first()
+            )
+            if entry is None or not reserve_seat(event_id):
+                break
+            entry.delete()
+            if link_participant(event_id, entry.user_id):
+                enqueue_rsvp_pairs([(event_id, entry.user_id)])
+                promoted += 1
+            else:
+                adjust_participant_count([event_id], -1)
+    if promoted:
+        bump_stats_version()
+    return promoted
@@ -0,0 +1,159 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TOKENS = 8
+
+
+def search_tokens(query):
+    return TOKEN_RE.findall(query or '')[:MAX_TOKENS]
+
+
+# Fallback: substring matching, only used on backends without a full-text engine
+class LikeSearchBackend:
+    rank_ordering = ()
+
+    def search(self, queryset, query):
+        for token in search_tokens(query):
+            queryset = queryset.filter(
+                Q(name__icontains=token) | Q(location__icontains=token)
+                | Q(description__icontains=token) | Q(category__name__icontains=token)
+            )
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index_events(self, event_ids):
+        pass
+
+    def add_events(self, event_ids):
+        # Rows that were never indexed, e.g. fresh bulk inserts
+        self.index_events(event_ids)
+
+    def remove_events(self, event_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+# SQLite: external FTS5 table keyed by event id, created in migration 0006
+class SQLiteFTSSearchBackend(LikeSearchBackend):
+    table = 'events_event_fts'
+    # bm25() is lower for better matches
+    rank_ordering = ('search_rank',)
+
+    def match_expression(self, tokens):
+        # Every token must match, each as a prefix so partially typed words already hit
+        return ' '.join('"%s"*' % token.replace('"', '""') for token in tokens)
+
+    def search(self, queryset, query):
+        tokens = search_tokens(query)
+        if not tokens:
+            return super().search(queryset, query)
+        match = self.match_expression(tokens)
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', (match,))
+        ).annotate(search_rank=RawSQL(
+            f'SELECT bm25({self.table}, 10.0, 5.0, 1.0, 5.0) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND rowid = events_event.id',
+            (match,), output_field=FloatField(),
+        ))
+
+    def index_events(self, event_ids):
+        event_ids = list(event_ids)
+        if not event_ids:
+            return
+        self.remove_events(event_ids)
+        self.add_events(event_ids)
+
+    def add_events(self, event_ids):
+        event_ids = list(event_ids)
+        if not event_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(event_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, name, location, description, category) '
+                f'SELECT e.id, e.name, e.location, e.description, c.name '
+                f'FROM events_event e JOIN events_category c ON c.id = e.category_id '
+                f'WHERE e.id IN ({placeholders})',
+                event_ids,
+            )
+
+    def remove_events(self, event_ids):
+        event_ids = list(event_ids)
+        if not event_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(event_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', event_ids)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, name, location, description, category) '
+                f'SELECT e.id, e.name, e.location, e.description, c.name '
+                f'FROM events_event e JOIN events_category c ON c.id = e.category_id'
+            )
+
+
+# PostgreSQL: stored tsvector column with a GIN index, created in migration 0006
+class PostgresSearchBackend(LikeSearchBackend):
+    config = 'english'
+    rank_ordering = ('-search_rank',)
+
+    vector_sql = (
+        "setweight(to_tsvector(%(config)s, coalesce(e.name, '')), 'A') || "
+        "setweight(to_tsvector(%(config)s, coalesce(c.name, '')), 'B') || "
+        "setweight(to_tsvector(%(config)s, coalesce(e.location, '')), 'B') || "
+        "setweight(to_tsvector(%(config)s, coalesce(e.description, '')), 'C')"
+    )
+
+    def tsquery(self, tokens):
+        # Tokens are plain \w+ words, so quoting them is enough to make to_tsquery safe
+        return ' & '.join("'%s':*" % token for token in tokens)
+
+    def search(self, queryset, query):
+        tokens = search_tokens(query)
+        if not tokens:
+            return super().search(queryset, query)
+        tsquery = self.tsquery(tokens)
+        return queryset.filter(id__in=RawSQL(
+            'SELECT id FROM events_event WHERE search_vector @@ to_tsquery(%s, %s)', (self.config, tsquery),
+        )).annotate(search_rank=RawSQL(
+            'ts_rank(events_event.search_vector, to_tsquery(%s, %s))', (self.config, tsquery),
+            output_field=FloatField(),
+        ))
+
+    def update_sql(self, where=''):
+        vector = self.vector_sql % {'config': "'%s'" % self.config}
+        return f'UPDATE events_event e SET search_vector = {vector} FROM events_category c WHERE c.id = e.category_id {where}'
+
+    def index_events(self, event_ids):
+        event_ids = list(event_ids)
+        if not event_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(self.update_sql('AND e.id = ANY(%s)'), (event_ids,))
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(self.update_sql())
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    path = getattr(settings, 'EVENT_SEARCH_BACKEND', '')
+    if path:
+        return import_string(path)()
+    return BACKENDS.get(connection.vendor, LikeSearchBackend)()
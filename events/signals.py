@@ -1,17 +1,149 @@
-from django.db.models.signals import m2m_changed
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from django.conf import settings
-from django.core.mail import send_mail
-from events.models import Event
+from events.models import Category, Event
+from events.search import get_search_backend
+from core.cache import bump_stats_version
+from core.images import derivatives_generated
+from events.counters import Participation, adjust_participant_count
+from events.outbox import enqueue_rsvp_emails
+from events.rsvp import promote_waitlist
+
+User = get_user_model()
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def send_rsvp_email(sender, instance, action, reverse, pk_set, **kwargs):
+    # Queue a confirmation for the newly added participants only; send_outbox delivers it
+    if action == 'post_add' and pk_set:
+        if reverse:
+            enqueue_rsvp_emails(pk_set, [instance.pk])
+        else:
+            enqueue_rsvp_emails([instance.pk], pk_set)
+
+
+# Keep Event.participant_count in step with the through table
+@receiver(m2m_changed, sender=Event.participants.through)
+def update_participant_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add' and pk_set:
+        # Django has already dropped ids that were present, so pk_set holds only new rows
+        if reverse:
+            adjust_participant_count(pk_set, 1)
+        else:
+            adjust_participant_count([instance.pk], len(pk_set))
+
+    elif action == 'pre_remove' and pk_set:
+        # remove() reports every requested id, so record which ones are actually linked
+        if reverse:
+            linked = Participation.objects.filter(customuser_id=instance.pk, event_id__in=pk_set)
+            instance._removed_event_ids = list(linked.values_list('event_id', flat=True))
+        else:
+            linked = Participation.objects.filter(event_id=instance.pk, customuser_id__in=pk_set)
+            instance._removed_participants = linked.count()
+
+    elif action == 'post_remove':
+        if reverse:
+            adjust_participant_count(getattr(instance, '_removed_event_ids', []), -1)
+        elif getattr(instance, '_removed_participants', 0):
+            adjust_participant_count([instance.pk], -instance._removed_participants)
+
+    elif action == 'pre_clear' and reverse:
+        instance._removed_event_ids = list(instance.rsvp_events.values_list('pk', flat=True))
+
+    elif action == 'post_clear':
+        if reverse:
+            adjust_participant_count(getattr(instance, '_removed_event_ids', []), -1)
+        else:
+            Event.objects.filter(pk=instance.pk).update(participant_count=0)
+
+
+# Deleting a user cascades through-table rows without m2m_changed
+@receiver(pre_delete, sender=User)
+def release_participant_seats(sender, instance, **kwargs):
+    event_ids = list(Participation.objects.filter(customuser_id=instance.pk).values_list('event_id', flat=True))
+    adjust_participant_count(event_ids, -1)
+    schedule_waitlist_promotion(event_ids)
+    if event_ids:
+        bump_stats_version()
+
+
+# Freed seats and raised capacities go to the waitlist once the change is committed
+def schedule_waitlist_promotion(event_ids):
+    for event_id in event_ids:
+        transaction.on_commit(lambda event_id=event_id: promote_waitlist(event_id))
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def promote_waitlisted_participants(sender, instance, action, reverse, **kwargs):
+    if action in ('post_remove', 'post_clear'):
+        if reverse:
+            schedule_waitlist_promotion(getattr(instance, '_removed_event_ids', []))
+        else:
+            schedule_waitlist_promotion([instance.pk])
+
+
+# Receivers reacting to an edited field compare against the stored row, read once before the save
+@receiver(pre_save, sender=Event)
+def remember_stored_event(sender, instance, update_fields=None, **kwargs):
+    watched = {'image', 'capacity'}
+    if instance.pk and (update_fields is None or watched & set(update_fields)):
+        instance._stored = Event.objects.filter(pk=instance.pk).values(*watched).first()
+    else:
+        instance._stored = None
+
+
+def capacity_raised(old, new):
+    return old is not None and (new is None or new > old)
+
+
+@receiver(post_save, sender=Event)
+def promote_on_capacity_change(sender, instance, created, **kwargs):
+    stored = instance._stored
+    if not created and stored and capacity_raised(stored['capacity'], instance.capacity):
+        schedule_waitlist_promotion([instance.pk])
+
+
+# Keep the full-text index in step with events and their category names
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, **kwargs):
+    get_search_backend().index_events([instance.pk])
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    get_search_backend().remove_events([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_events(sender, instance, created, **kwargs):
+    if not created:
+        get_search_backend().index_events(instance.events.values_list('pk', flat=True))
+
+
+# Invalidate cached listing aggregates (see core.cache)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_event_stats(sender, **kwargs):
+    bump_stats_version()
+
 
 @receiver(m2m_changed, sender=Event.participants.through)
-def send_rsvp_email(sender, instance, action, **kwargs):
-    if action == 'post_add':
-        for user in instance.participants.all():
-            subject = "RSVP Confirmation"
-            message = f"Hi {user.username}, you have RSVPed to the event: {instance.name}"
-            recipient_list = [user.email]
-            try:
-                send_mail(subject, message, settings.EMAIL_HOST_USER, recipient_list)
-            except Exception as e:
-                print(f"{user.email} Failed to send RSVP email: {str(e)}")
\ No newline at end of file
+def invalidate_participant_stats(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_stats_version()
+
+
+# Derivative readiness lives on the row: a new image starts over, a finished set flips it on
+@receiver(post_save, sender=Event)
+def reset_image_derivatives(sender, instance, created, **kwargs):
+    stored = instance._stored
+    if not created and stored and stored['image'] != instance.image.name:
+        Event.objects.filter(pk=instance.pk).update(image_derivatives_ready=False)
+        instance.image_derivatives_ready = False
+
+
+@receiver(derivatives_generated)
+def mark_image_derivatives_ready(sender, name, **kwargs):
+    Event.objects.filter(image=name, image_derivatives_ready=False).update(image_derivatives_ready=True)
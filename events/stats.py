@@ -0,0 +1,28 @@
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from events.models import Event
+
+
+def statistics_aggregates(today):
+    return {
+        'total_events': Count('id'),
+        'upcoming_events': Count('id', filter=Q(date__gte=today)),
+        'past_events': Count('id', filter=Q(date__lt=today)),
+        'today_events': Count('id', filter=Q(date=today)),
+        'total_participants': Coalesce(Sum('participant_count'), 0),
+    }
+
+
+def event_statistics(queryset=None, today=None):
+    # All headline numbers from one conditional-aggregation query over the (optionally pre-filtered) events
+    if queryset is None:
+        queryset = Event.objects.all()
+    return queryset.order_by().aggregate(**statistics_aggregates(today or now().date()))
+
+
+async def aevent_statistics(queryset=None, today=None):
+    if queryset is None:
+        queryset = Event.objects.all()
+    return await queryset.order_by().aaggregate(**statistics_aggregates(today or now().date()))
@@ -1,3 +1,715 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import m2m_changed
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from django.utils.timezone import now
+from PIL import Image
+
+from core import images
+from core.testing import (
+    QueryBudgetMixin, add_participants, make_categories, make_events, make_role_user, make_users, max_queries,
+)
+from events import rsvp
+from events.models import Category, Event, OutboxEmail, WaitlistEntry
+from events.search import LikeSearchBackend, get_search_backend
+from events.stats import event_statistics
+from events.views import EVENT_EXPORT_COLUMNS, PARTICIPANT_EXPORT_COLUMNS
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), "EXPLAIN output is only checked on SQLite and PostgreSQL")
+class EventIndexUsageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(5)])
+        today = now().date()
+        Event.objects.bulk_create([
+            Event(
+                name=f"Event {i}",
+                description="Description",
+                date=today + datetime.timedelta(days=i % 60 - 30),
+                time=datetime.time(i % 24),
+                location="Dhaka",
+                category=cls.categories[i % 5],
+            )
+            for i in range(500)
+        ])
+        cls.organizer = User.objects.create_user(username='organizer', email='organizer@example.com', password='pass')
+        cls.organizer.groups.add(Group.objects.get_or_create(name='Organizer')[0])
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Tiny test tables would otherwise always be read sequentially
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}")
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+
+    def listing_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "events_event"' in query['sql'] and 'ORDER BY' in query['sql']
+        ]
+
+    def assertQueriesUseIndex(self, queries, index_name):
+        self.assertTrue(queries)
+        for sql in queries:
+            self.assertIn(index_name, self.explain(sql), sql)
+
+    def test_home_listing_uses_date_index(self):
+        self.assertQueriesUseIndex(self.listing_queries(reverse('home')), 'event_date_time_id_idx')
+
+    def test_home_category_filter_uses_category_date_index(self):
+        url = f"{reverse('home')}?category={self.categories[2].id}"
+        self.assertQueriesUseIndex(self.listing_queries(url), 'event_category_date_idx')
+
+    def test_organizer_dashboard_listings_use_date_index(self):
+        self.client.force_login(self.organizer)
+        for event_filter in ('today', 'upcoming', 'past', 'all'):
+            with self.subTest(filter=event_filter):
+                url = f"{reverse('organizer_dashboard')}?filter={event_filter}"
+                self.assertQueriesUseIndex(self.listing_queries(url), 'event_date_time_id_idx')
+
+
+class RSVPConcurrencyTests(TransactionTestCase):
+    threads = 12
+
+    def setUp(self):
+        category = Category.objects.create(name="Conference")
+        self.event = Event.objects.create(
+            name="Launch", description="Description", date=now().date(), time=datetime.time(18),
+            location="Dhaka", category=category, capacity=5,
+        )
+        self.users = User.objects.bulk_create([
+            User(username=f'user{i}', email=f'user{i}@example.com') for i in range(self.threads)
+        ])
+
+    def hammer(self, users):
+        barrier = threading.Barrier(len(users))
+
+        def attempt(user):
+            barrier.wait()
+            try:
+                return rsvp.rsvp(self.event.id, user)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(users)) as executor:
+            return list(executor.map(attempt, users))
+
+    def test_capacity_is_never_exceeded(self):
+        statuses = self.hammer(self.users)
+
+        self.event.refresh_from_db()
+        self.assertEqual(statuses.count(rsvp.CONFIRMED), 5)
+        self.assertEqual(statuses.count(rsvp.WAITLISTED), self.threads - 5)
+        self.assertEqual(self.event.participant_count, 5)
+        self.assertEqual(self.event.participants.count(), 5)
+        self.assertEqual(WaitlistEntry.objects.filter(event=self.event).count(), self.threads - 5)
+        self.assertEqual(OutboxEmail.objects.count(), 5)
+
+    def test_same_user_rsvps_once(self):
+        self.event.capacity = None
+        self.event.save()
+        statuses = self.hammer([self.users[0]] * self.threads)
+
+        self.event.refresh_from_db()
+        self.assertEqual(statuses.count(rsvp.CONFIRMED), 1)
+        self.assertEqual(statuses.count(rsvp.ALREADY_RSVPED), self.threads - 1)
+        self.assertEqual(self.event.participant_count, 1)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_only_a_raised_capacity_promotes_the_waitlist(self):
+        self.hammer(self.users[:8])
+        self.event.refresh_from_db()
+        with patch('events.signals.promote_waitlist') as promote:
+            self.event.name = "Renamed"
+            self.event.save()
+            self.event.capacity = 4
+            self.event.save()
+            promote.assert_not_called()
+
+        self.event.capacity = 6
+        self.event.save()
+        self.assertEqual(WaitlistEntry.objects.filter(event=self.event).count(), 2)
+        self.event.refresh_from_db()
+        self.event.capacity = None
+        self.event.save()
+        self.assertFalse(WaitlistEntry.objects.filter(event=self.event).exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 8)
+
+    def test_freed_seat_goes_to_first_waitlisted_user(self):
+        self.hammer(self.users[:6])
+        waiting = WaitlistEntry.objects.get(event=self.event).user
+
+        self.event.participants.remove(self.event.participants.first())
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 5)
+        self.assertTrue(self.event.participants.filter(pk=waiting.pk).exists())
+        self.assertFalse(WaitlistEntry.objects.filter(event=self.event).exists())
+
+
+class EventQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        cls.event = make_events(1, cls.category)[0]
+        cls.organizer = make_role_user('organizer', 'Organizer')
+        cls.participant = make_role_user('participant', 'Participant')
+
+    def setUp(self):
+        self.client.force_login(self.organizer)
+
+    def grow_events(self, rows):
+        make_events(rows, self.category)
+
+    def grow_participants(self, rows):
+        add_participants(self.event, rows)
+
+    def test_dashboard_redirect(self):
+        self.assertQueryBudget(6, reverse('dashboard'), self.grow_events, status=302)
+
+    def test_event_list(self):
+        self.assertQueryBudget(7, reverse('event_list'), self.grow_events)
+
+    def test_event_create(self):
+        self.assertQueryBudget(8, reverse('event_create'), self.grow_participants)
+
+    def test_event_update(self):
+        self.assertQueryBudget(10, reverse('event_update', args=[self.event.id]), self.grow_participants)
+
+    def test_event_delete(self):
+        def grow(rows):
+            event = make_events(1, self.category)[0]
+            add_participants(event, rows)
+            return event
+        self.assertQueryBudget(11, lambda event: reverse('event_delete', args=[event.id]), grow, method='post', status=302)
+
+    def test_event_details(self):
+        self.assertQueryBudget(8, reverse('event_details', args=[self.event.id]), self.grow_participants)
+
+    def test_async_event_list(self):
+        self.assertQueryBudget(4, reverse('async_event_list'), self.grow_events)
+
+    def test_async_event_details(self):
+        self.assertQueryBudget(5, reverse('async_event_details', args=[self.event.id]), self.grow_participants)
+
+    def test_event_attendees(self):
+        self.assertQueryBudget(4, reverse('event_attendees', args=[self.event.id]), self.grow_participants)
+
+    def test_event_export(self):
+        self.assertQueryBudget(7, reverse('event_export'), self.grow_events)
+
+    def test_event_participants_export(self):
+        self.assertQueryBudget(8, reverse('event_participants_export', args=[self.event.id]), self.grow_participants)
+
+    def test_category_list(self):
+        def grow(rows):
+            for category in make_categories(rows // 10):
+                make_events(10, category)
+        self.assertQueryBudget(7, reverse('category_list'), grow)
+
+    def test_category_create(self):
+        self.assertQueryBudget(6, reverse('category_create'), make_categories)
+
+    def test_category_update(self):
+        self.assertQueryBudget(7, reverse('category_update', args=[self.category.id]), self.grow_events)
+
+    def test_category_delete(self):
+        # Cascaded events are deleted one post_delete signal at a time, so this grows the table, not the category
+        def grow(rows):
+            make_categories(rows)
+            category = make_categories(1)[0]
+            make_events(1, category)
+            return category
+        self.assertQueryBudget(13, lambda category: reverse('category_delete', args=[category.id]), grow, method='post', status=302)
+
+    def test_event_attendees_update(self):
+        # The attendee table grows; the diff stays picker-sized
+        def grow(rows):
+            attendees = add_participants(self.event, rows)
+            newcomers = make_users(10, prefix=f'newcomer{rows}-')
+            return {'add': [user.id for user in newcomers], 'remove': [user.id for user in attendees[:10]]}
+        url = reverse('event_attendees_update', args=[self.event.id])
+        self.assertQueryBudget(25, url, grow, method='post', data=lambda diff: diff, status=302)
+
+    def test_rsvp_event(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(15, reverse('rsvp_event', args=[self.event.id]), self.grow_participants, method='post', status=302)
+
+    def test_attendee_diff(self):
+        attendees = add_participants(self.event, 3)
+        newcomer = make_users(1)[0]
+        added, removed = rsvp.apply_attendee_diff(self.event.id, [newcomer.id, attendees[1].id], [attendees[0].id])
+        self.assertEqual((added, removed), (1, 1))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 3)
+        self.assertEqual(set(self.event.participants.values_list('id', flat=True)), {newcomer.id, attendees[1].id, attendees[2].id})
+
+    @max_queries(9)
+    def test_rsvp_service(self):
+        self.assertEqual(rsvp.rsvp(self.event.id, self.participant), rsvp.CONFIRMED)
+
+
+class EventAPITests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        cls.events = make_events(5, cls.category, days=1)
+        cls.participant = make_role_user('participant', 'Participant')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # ETags need a version every worker shares
+        location = cls.enterClassContext(tempfile.TemporaryDirectory())
+        shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+        caches_setting = {**settings.CACHES, 'shared': shared}
+        cls.enterClassContext(override_settings(CACHES=caches_setting, STATS_CACHE_ALIAS='shared'))
+
+    def grow_events(self, rows):
+        make_events(rows, self.category)
+
+    def test_list_pages_with_cursor(self):
+        first = self.client.get(reverse('api_event_list'), {'page_size': 3}).json()
+        self.assertEqual(len(first['results']), 3)
+        self.assertEqual(first['results'][0]['category_name'], self.category.name)
+        second = self.client.get(reverse('api_event_list'), {'page_size': 3, 'cursor': first['next']}).json()
+        self.assertEqual(len(second['results']), 2)
+        self.assertIsNone(second['next'])
+
+    def test_unchanged_data_is_not_modified(self):
+        response = self.client.get(reverse('api_event_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.get(reverse('api_event_list'), headers={'If-None-Match': response['ETag']}).status_code, 304,
+        )
+        self.assertNotIn('Last-Modified', response)
+
+    def test_rsvp_is_not_hidden_by_if_modified_since(self):
+        url = reverse('api_event_detail', args=[self.events[0].id])
+        since = http_date(time.time() + 60)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        rsvp.rsvp(self.events[0].id, self.participant)
+        response = self.client.get(url, headers={'If-Modified-Since': since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['participant_count'], 1)
+
+    def test_moved_rsvp_changes_etag(self):
+        url = reverse('api_event_list')
+        rsvp.rsvp(self.events[1].id, self.participant)
+        etag = self.client.get(url)['ETag']
+        # Totals stay the same: one event gains the seat the other loses
+        rsvp.bulk_remove_participants(self.events[1].id, [self.participant.id])
+        rsvp.rsvp(self.events[0].id, self.participant)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        counts = {row['id']: row['participant_count'] for row in response.json()['results']}
+        self.assertEqual((counts[self.events[0].id], counts[self.events[1].id]), (1, 0))
+
+    @override_settings(STATS_CACHE_ALIAS='default')
+    def test_process_local_version_offers_no_etag(self):
+        self.assertNotIn('ETag', self.client.get(reverse('api_event_list')))
+
+    def test_rsvp_changes_etag(self):
+        url = reverse('api_event_detail', args=[self.events[0].id])
+        etag = self.client.get(url)['ETag']
+        rsvp.rsvp(self.events[0].id, self.participant)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['participant_count'], 1)
+
+    def test_event_list_budget(self):
+        self.assertQueryBudget(3, reverse('api_event_list'), self.grow_events)
+
+    def test_event_detail_budget(self):
+        self.assertQueryBudget(3, reverse('api_event_detail', args=[self.events[0].id]), self.grow_events)
+
+    def test_category_list_budget(self):
+        self.assertQueryBudget(3, reverse('api_category_list'), make_categories)
+
+
+class EventImageCleanupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        cls.organizer = make_role_user('organizer', 'Organizer')
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_login(self.organizer)
+
+    def test_delete_removes_original_and_derivatives(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (100, 100), 'blue').save(buffer, 'PNG')
+        name = default_storage.save('event_images/cleanup.png', ContentFile(buffer.getvalue()))
+        images.generate_derivatives(name)
+        event = make_events(1, self.category)[0]
+        Event.objects.filter(pk=event.pk).update(image=name)
+
+        response = self.client.post(reverse('event_delete', args=[event.id]), follow=True)
+        self.assertContains(response, 'Event deleted successfully')
+        self.assertFalse(Event.objects.filter(pk=event.pk).exists())
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(any(default_storage.exists(target) for target in images.derivative_names(name)))
+
+
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = make_events(1, make_categories(1)[0])[0]
+        cls.participant = make_role_user('participant', 'Participant')
+
+    def send_outbox(self, *args):
+        call_command('send_outbox', *args, stdout=io.StringIO())
+
+    def test_rsvp_queues_the_email_and_the_worker_sends_it(self):
+        self.client.force_login(self.participant)
+        self.client.post(reverse('rsvp_event', args=[self.event.id]))
+        self.assertEqual(mail.outbox, [])
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.recipient, email.status), (self.participant.email, OutboxEmail.PENDING))
+
+        self.send_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.participant.email])
+        self.assertIn(self.event.name, mail.outbox[0].body)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.SENT, 1))
+        self.assertIsNotNone(email.sent_at)
+
+    def test_failures_back_off_then_give_up(self):
+        rsvp.rsvp(self.event.id, self.participant)
+        with patch('events.outbox.EmailMessage.send', side_effect=OSError('connection refused')):
+            self.send_outbox('--base-delay', '60', '--max-attempts', '2')
+            email = OutboxEmail.objects.get()
+            self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDING, 1))
+            self.assertEqual(email.last_error, 'connection refused')
+            self.assertGreater(email.next_attempt_at, now() + datetime.timedelta(seconds=50))
+
+            # Not due yet: a second run leaves it alone
+            self.send_outbox('--max-attempts', '2')
+            email.refresh_from_db()
+            self.assertEqual(email.attempts, 1)
+
+            OutboxEmail.objects.update(next_attempt_at=now())
+            self.send_outbox('--max-attempts', '2')
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.FAILED, 2))
+        self.assertEqual(mail.outbox, [])
+
+
+class ParticipantCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+
+    def setUp(self):
+        self.events = make_events(2, self.category)
+        self.users = make_users(3)
+
+    def counts(self):
+        events = Event.objects.filter(pk__in=[event.pk for event in self.events]).order_by('pk')
+        return list(events.values_list('participant_count', flat=True))
+
+    def test_counter_follows_both_sides_of_the_relation(self):
+        first, second = self.events
+        first.participants.add(*self.users)
+        first.participants.add(self.users[0])
+        self.users[0].rsvp_events.add(first, second)
+        self.assertEqual(self.counts(), [3, 1])
+
+        first.participants.remove(self.users[1], self.users[1])
+        self.users[0].rsvp_events.remove(second)
+        self.assertEqual(self.counts(), [2, 0])
+
+        self.users[2].rsvp_events.add(second)
+        self.users[2].rsvp_events.clear()
+        self.assertEqual(self.counts(), [1, 0])
+        first.participants.clear()
+        self.assertEqual(self.counts(), [0, 0])
+
+    def test_deleting_a_user_releases_their_seats(self):
+        for event in self.events:
+            event.participants.add(*self.users)
+        self.users[0].delete()
+        self.assertEqual(self.counts(), [2, 2])
+
+    def test_stale_instance_save_keeps_the_counter(self):
+        event = self.events[0]
+        event.participants.add(*self.users)
+        event.name = 'Renamed'
+        event.save()
+        self.assertEqual(self.counts(), [3, 0])
+
+    def test_recount_repairs_drift(self):
+        self.events[0].participants.add(*self.users)
+        Event.objects.update(participant_count=7)
+        out = io.StringIO()
+        call_command('recount_participants', stdout=out)
+        self.assertEqual(self.counts(), [3, 0])
+        self.assertIn('2 event(s)', out.getvalue())
+
+
+class SearchBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.music = Category.objects.create(name='Music')
+        cls.tech = Category.objects.create(name='Technology')
+        fields = {'date': now().date(), 'time': datetime.time(18)}
+        # Created first, so only ranking can put the concert ahead of it
+        cls.meetup = Event.objects.create(
+            name='Python Meetup', description='Talks, then a jazz jam session', location='Chittagong',
+            category=cls.tech, **fields,
+        )
+        cls.concert = Event.objects.create(
+            name='Jazz Concert', description='An evening of live jazz', location='Dhaka',
+            category=cls.music, **fields,
+        )
+
+    def search(self, query, backend=None):
+        backend = backend or get_search_backend()
+        events = backend.search(Event.objects.all(), query).order_by(*backend.rank_ordering, 'id')
+        return list(events.values_list('name', flat=True))
+
+    def test_like_backend_requires_every_token(self):
+        backend = LikeSearchBackend()
+        self.assertEqual(self.search('jazz', backend), ['Python Meetup', 'Jazz Concert'])
+        self.assertEqual(self.search('jazz chittagong', backend), ['Python Meetup'])
+        self.assertEqual(self.search('technology', backend), ['Python Meetup'])
+
+    @skipUnless(connection.vendor == 'sqlite', "FTS5 index is SQLite only")
+    def test_fts_matches_prefixes_and_ranks_names_first(self):
+        self.assertEqual(self.search('jaz'), ['Jazz Concert', 'Python Meetup'])
+        self.assertEqual(self.search('jazz techn'), ['Python Meetup'])
+        # FTS5 syntax in the input is matched as plain words
+        self.assertEqual(self.search('"jazz*" ('), ['Jazz Concert', 'Python Meetup'])
+        self.assertEqual(self.search('jazz OR opera'), [])
+        self.assertEqual(self.search('opera'), [])
+
+    @skipUnless(connection.vendor == 'sqlite', "FTS5 index is SQLite only")
+    def test_fts_index_follows_edits_deletes_and_category_renames(self):
+        self.concert.name = 'Opera Night'
+        self.concert.save()
+        self.assertEqual(self.search('opera'), ['Opera Night'])
+        self.tech.name = 'Programming'
+        self.tech.save()
+        self.assertEqual(self.search('programming'), ['Python Meetup'])
+        self.meetup.delete()
+        self.assertEqual(self.search('jazz'), ['Opera Night'])
+
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM events_event_fts')
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(self.search('opera'), ['Opera Night'])
+
+
+class EventStatisticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        make_events(1, cls.category, days=-3)
+        today = make_events(2, cls.category)
+        upcoming = make_events(3, cls.category, days=5)
+        add_participants(today[0], 2)
+        add_participants(upcoming[0], 3)
+
+    def test_headline_numbers_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            stats = event_statistics()
+        self.assertEqual(stats, {
+            'total_events': 6, 'upcoming_events': 5, 'past_events': 1, 'today_events': 2, 'total_participants': 5,
+        })
+
+    def test_filtered_queryset_and_empty_table(self):
+        stats = event_statistics(Event.objects.filter(participant_count__gt=0))
+        self.assertEqual((stats['total_events'], stats['today_events'], stats['total_participants']), (2, 1, 5))
+        self.assertEqual(event_statistics(Event.objects.none())['total_participants'], 0)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category, other = make_categories(2)
+        cls.events = make_events(3, cls.category, days=1)
+        make_events(2, other, days=1)
+        Event.objects.filter(pk=cls.events[0].pk).update(description='Talks, "demos", food')
+        cls.attendees = add_participants(cls.events[0], 2)
+        cls.organizer = make_role_user('organizer', 'Organizer')
+
+    def setUp(self):
+        self.client.force_login(self.organizer)
+
+    def export(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_event_csv_honours_filters_and_quotes_fields(self):
+        response, body = self.export(reverse('event_export'), category=self.category.id)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="events.csv"')
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], list(EVENT_EXPORT_COLUMNS))
+        self.assertEqual([row[0] for row in rows[1:]], [str(event.id) for event in self.events])
+        self.assertEqual(rows[1][-2:], ['2', 'Talks, "demos", food'])
+
+    def test_attendee_ndjson(self):
+        url = reverse('event_participants_export', args=[self.events[0].id])
+        response, body = self.export(url, format='ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['username'] for row in rows], [user.username for user in self.attendees])
+        self.assertEqual(set(rows[0]), set(PARTICIPANT_EXPORT_COLUMNS))
+
+
+class ImportEventsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.music = Category.objects.create(name='Music')
+        cls.users = make_users(2)
+
+    def import_file(self, name, content):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, name)
+            errors_path = os.path.join(directory, 'errors.csv')
+            with open(path, 'w', newline='', encoding='utf-8') as handle:
+                handle.write(content)
+            call_command('import_events', path, '--errors', errors_path, '--batch-size', '2', stdout=io.StringIO())
+            with open(errors_path, newline='') as handle:
+                return {int(line): json.loads(errors) for line, errors in list(csv.reader(handle))[1:]}
+
+    def test_csv_rows_are_validated_and_loaded_with_rsvps(self):
+        usernames = ';'.join(user.username for user in self.users)
+        errors = self.import_file('events.csv', '\n'.join([
+            'name,description,date,time,location,category,participants',
+            f'Jazz Night,Live jazz,2030-05-01,19:30,Dhaka,Music,{usernames};ghost',
+            'Hackathon,Build things,2030-05-02,09:00,Chittagong,Technology,',
+            '   ,Blank name,2030-05-03,10:00,Dhaka,Music,',
+            f'{"x" * 201},Too long,2030-05-03,10:00,Dhaka,Music,',
+            'Bad date,Oops,2030-02-30,10:00,Dhaka,Music,',
+            'No category,Oops,2030-05-03,10:00,Dhaka,,',
+        ]) + '\n')
+
+        self.assertEqual(set(Event.objects.values_list('name', flat=True)), {'Jazz Night', 'Hackathon'})
+        jazz = Event.objects.get(name='Jazz Night')
+        self.assertEqual(jazz.category, self.music)
+        self.assertEqual((jazz.date, jazz.time), (datetime.date(2030, 5, 1), datetime.time(19, 30)))
+        self.assertEqual(jazz.participant_count, 2)
+        self.assertEqual(set(jazz.participants.all()), set(self.users))
+        self.assertEqual(Event.objects.get(name='Hackathon').category.name, 'Technology')
+        self.assertEqual(errors[2], {'participants': ['Unknown users skipped: ghost']})
+        self.assertEqual(set(errors[4]), {'name'})
+        self.assertEqual(set(errors[5]), {'name'})
+        self.assertEqual(set(errors[6]), {'date'})
+        self.assertEqual(set(errors[7]), {'category'})
+        self.assertEqual(get_search_backend().search(Event.objects.all(), 'hackath').get().name, 'Hackathon')
+
+    def test_ndjson_accepts_participant_lists_and_reports_bad_lines(self):
+        rows = [
+            {'name': 'Concert', 'description': 'Loud', 'date': '2030-06-01', 'time': '20:00', 'location': 'Dhaka',
+             'category': 'Music', 'participants': [self.users[0].username]},
+            'not json',
+            ['a', 'list'],
+        ]
+        content = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows) + '\n'
+        errors = self.import_file('events.ndjson', content)
+        self.assertEqual(Event.objects.get().participant_count, 1)
+        self.assertEqual(set(errors), {2, 3})
+
+
+class BulkRSVPTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.events = make_events(2, make_categories(1)[0], days=1)
+        cls.users = make_users(3)
+        cls.events[0].participants.add(cls.users[0])
+        OutboxEmail.objects.all().delete()
+
+    def counts(self):
+        return list(Event.objects.order_by('pk').values_list('participant_count', flat=True))
+
+    def test_new_pairs_only_with_counters_and_no_emails(self):
+        first, second = self.events
+        pairs = [(first.id, user.id) for user in self.users] + [(second.id, self.users[1].id)] * 2
+        signals = []
+
+        def receiver(action, **kwargs):
+            signals.append(action)
+
+        m2m_changed.connect(receiver, sender=Event.participants.through)
+        self.addCleanup(m2m_changed.disconnect, receiver, sender=Event.participants.through)
+        self.assertEqual(rsvp.bulk_add_participants(pairs, batch_size=2), 3)
+        self.assertEqual(signals, [])
+        self.assertEqual(self.counts(), [3, 1])
+        self.assertFalse(OutboxEmail.objects.exists())
+
+        self.assertEqual(rsvp.bulk_add_participants([(second.id, self.users[2].id)], notify=True), 1)
+        self.assertEqual(list(OutboxEmail.objects.values_list('recipient', flat=True)), [self.users[2].email])
+
+    def test_existing_pairs_matches_exact_pairs(self):
+        first, second = self.events
+        second.participants.add(self.users[1])
+        crossed = [(first.id, self.users[1].id), (second.id, self.users[0].id)]
+        self.assertEqual(rsvp.existing_pairs(crossed), set())
+
+        pairs = crossed + [(first.id, self.users[0].id), (second.id, self.users[1].id)]
+        with self.assertNumQueries(2):
+            found = rsvp.existing_pairs(pairs, chunk_size=2)
+        self.assertEqual(found, {(first.id, self.users[0].id), (second.id, self.users[1].id)})
+
+    def test_import_rsvps_resolves_usernames_and_ids(self):
+        first, second = self.events
+        content = '\n'.join([
+            'event_id,username,user_id',
+            f'{first.id},{self.users[1].username},',
+            f'{second.id},,{self.users[2].id}',
+            f'{second.id},ghost,',
+            f'999999,{self.users[1].username},',
+            ',,',
+        ]) + '\n'
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_rsvps', handle.name, '--notify', stdout=out, stderr=err)
+
+        self.assertIn('Added 2 RSVPs', out.getvalue())
+        self.assertIn('skipped 3 rows', out.getvalue())
+        self.assertEqual(self.counts(), [2, 1])
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+        self.assertIn('Line 4: unknown event or user', err.getvalue())
@@ -1,4 +1,5 @@
 from django.urls import path
+from events import api
 from events.views import (
     DashboardRedirectView,
     EventListView,
@@ -11,6 +12,12 @@ from events.views import (
     CategoryUpdateView,
     CategoryDeleteView,
     RSVPEventView,
+    EventExportView,
+    EventParticipantsExportView,
+    EventAttendeesView,
+    EventAttendeesUpdateView,
+    AsyncEventListView,
+    AsyncEventDetailView,
 )
 
 urlpatterns = [
@@ -23,6 +30,10 @@ urlpatterns = [
     path('event_update/<int:id>/', EventUpdateView.as_view(), name='event_update'),
     path('event_delete/<int:id>/', EventDeleteView.as_view(), name='event_delete'),
     path('event_details/<int:id>/', EventDetailView.as_view(), name='event_details'),
+    path('event_attendees/<int:id>/', EventAttendeesView.as_view(), name='event_attendees'),
+    path('event_attendees_update/<int:id>/', EventAttendeesUpdateView.as_view(), name='event_attendees_update'),
+    path('event_export/', EventExportView.as_view(), name='event_export'),
+    path('event_participants_export/<int:id>/', EventParticipantsExportView.as_view(), name='event_participants_export'),
 
     # categories
     path('category_list/', CategoryListView.as_view(), name='category_list'),
@@ -32,4 +43,13 @@ urlpatterns = [
 
     # RSVP
     path('rsvp_event/<int:event_id>/', RSVPEventView.as_view(), name='rsvp_event'),
+
+    # async variants of the read-heavy pages, for ASGI deployments
+    path('async/event_list/', AsyncEventListView.as_view(), name='async_event_list'),
+    path('async/event_details/<int:id>/', AsyncEventDetailView.as_view(), name='async_event_details'),
+
+    # JSON API (read-only)
+    path('api/', api.event_list, name='api_event_list'),
+    path('api/<int:id>/', api.event_detail, name='api_event_detail'),
+    path('api/categories/', api.category_list, name='api_category_list'),
 ]
\ No newline at end of file
@@ -1,15 +1,72 @@
+import asyncio
+
 from django.shortcuts import render, redirect
 from django.views import View
-from django.views.generic import ListView, DetailView, DeleteView
+from django.views.generic import ListView, DetailView, DeleteView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import PermissionDenied
 from django.contrib import messages
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils.timezone import now
 from events.models import Event, Category
-from events.forms import EventForm, CategoryForm
+from events.forms import AttendeesForm, EventForm, CategoryForm
 import os
 from django.conf import settings
 from django.db.models import Count
+from core.pagination import KeysetPaginationMixin, akeyset_paginate, keyset_paginate
+from users.roles import aget_request_user, ahas_role, has_role
+from core.images import delete_derivatives
+from events.exports import export_format, export_response
+from events.filters import EventFilters
+from django.shortcuts import get_object_or_404
+from django.http import Http404
+from events import rsvp
+
+EVENT_JSON_FIELDS = ('id', 'name', 'date', 'time', 'location', 'category.name', 'participant_count')
+
+EVENT_EXPORT_COLUMNS = {
+    'id': 'id',
+    'name': 'name',
+    'date': 'date',
+    'time': 'time',
+    'location': 'location',
+    'category': 'category__name',
+    'participants': 'participant_count',
+    'description': 'description',
+}
+
+PARTICIPANT_EXPORT_COLUMNS = {
+    'id': 'customuser_id',
+    'username': 'customuser__username',
+    'first_name': 'customuser__first_name',
+    'last_name': 'customuser__last_name',
+    'email': 'customuser__email',
+}
+
+# Attendees are paged along the through table's (event, user) unique index
+ATTENDEE_PAGE_SIZE = 24
+ATTENDEE_ORDERING = ('customuser_id',)
+
+
+def attendees_queryset(event_id):
+    return (
+        Event.participants.through.objects
+        .filter(event_id=event_id)
+        .select_related('customuser')
+        .only(
+            'customuser__username', 'customuser__first_name', 'customuser__last_name',
+            'customuser__email', 'customuser__profile_picture',
+        )
+    )
+
+
+RSVP_MESSAGES = {
+    rsvp.CONFIRMED: (messages.SUCCESS, "RSVP successful! A confirmation email will be sent shortly."),
+    rsvp.ALREADY_RSVPED: (messages.WARNING, "You have already RSVPed to this event."),
+    rsvp.WAITLISTED: (messages.INFO, "This event is full. You have been added to the waitlist."),
+    rsvp.ALREADY_WAITLISTED: (messages.WARNING, "You are already on the waitlist for this event."),
+}
 
 
 # Role mixins
@@ -17,36 +74,64 @@ class AdminOrganizerRequiredMixin(UserPassesTestMixin):
     login_url = 'no_permission'
 
     def test_func(self):
-        return self.request.user.groups.filter(name__in=['Admin', 'Organizer']).exists()
+        return has_role(self.request, 'Admin', 'Organizer')
 
 
 class ParticipantRequiredMixin(UserPassesTestMixin):
     login_url = 'no_permission'
 
     def test_func(self):
-        return self.request.user.groups.filter(name='Participant').exists()
+        return has_role(self.request, 'Participant')
+
+
+# Async views: login and role checks are awaited before the async handler runs
+class AsyncAccessMixin:
+    required_roles = ()
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await aget_request_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if self.required_roles and not await ahas_role(request, *self.required_roles):
+            raise PermissionDenied
+        return await super().dispatch(request, *args, **kwargs)
 
 
 # Dashboard redirect based on role
 class DashboardRedirectView(LoginRequiredMixin, View):
     def get(self, request):
         user = request.user
-        if user.is_superuser or user.groups.filter(name='Admin').exists():
+        if user.is_superuser or has_role(request, 'Admin'):
             return redirect('admin_dashboard')
-        elif user.groups.filter(name='Organizer').exists():
+        elif has_role(request, 'Organizer'):
             return redirect('organizer_dashboard')
         else:
             return redirect('participant_dashboard')
 
 
 # Event List
-class EventListView(LoginRequiredMixin, ListView):
+class EventListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Event
     template_name = 'events/event_list.html'
-    context_object_name = 'events'
+    json_fields = EVENT_JSON_FIELDS
 
     def get_queryset(self):
-        return Event.objects.select_related('category').order_by('date')
+        return Event.objects.select_related('category')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = self.paginate_keyset(self.object_list)
+        context.update({'events': page, 'page': page})
+        return context
+
+
+class AsyncEventListView(AsyncAccessMixin, KeysetPaginationMixin, TemplateView):
+    template_name = 'events/event_list.html'
+    json_fields = EVENT_JSON_FIELDS
+
+    async def get(self, request, *args, **kwargs):
+        page = await self.apaginate_keyset(Event.objects.select_related('category'))
+        return self.render_to_response(self.get_context_data(events=page, page=page))
 
 
 # Event Details
@@ -57,7 +142,48 @@ class EventDetailView(LoginRequiredMixin, DetailView):
     pk_url_kwarg = 'id'
 
     def get_queryset(self):
-        return Event.objects.select_related('category').prefetch_related('participants')
+        return Event.objects.select_related('category')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Only the first page of attendees; the rest is fetched from EventAttendeesView
+        context['attendees'] = keyset_paginate(attendees_queryset(self.object.id), ATTENDEE_ORDERING, None, ATTENDEE_PAGE_SIZE)
+        return context
+
+
+class AsyncEventDetailView(AsyncAccessMixin, TemplateView):
+    template_name = 'events/event_details.html'
+
+    async def get(self, request, id):
+        # The attendee page only needs the id from the URL, so both queries are issued together
+        try:
+            event, attendees = await asyncio.gather(
+                Event.objects.select_related('category').aget(id=id),
+                akeyset_paginate(attendees_queryset(id), ATTENDEE_ORDERING, None, ATTENDEE_PAGE_SIZE),
+            )
+        except Event.DoesNotExist:
+            raise Http404("Event not found")
+        return self.render_to_response(self.get_context_data(object=event, event=event, attendees=attendees))
+
+
+# Event Attendees: further pages for the detail page, as an HTML fragment or ?format=json
+class EventAttendeesView(LoginRequiredMixin, KeysetPaginationMixin, TemplateView):
+    template_name = 'events/attendees.html'
+    page_size = ATTENDEE_PAGE_SIZE
+    keyset_ordering = ATTENDEE_ORDERING
+    json_fields = ('customuser.id', 'customuser.username', 'customuser.first_name', 'customuser.last_name')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        event = get_object_or_404(Event.objects.only('id'), id=self.kwargs['id'])
+        page = self.paginate_keyset(attendees_queryset(event.id))
+        context.update({'event': event, 'attendees': page, 'page': page})
+        return context
+
+    def serialize_object(self, obj):
+        data = super().serialize_object(obj)
+        data['customuser_profile_picture'] = obj.customuser.profile_picture.url if obj.customuser.profile_picture else None
+        return data
 
 
 # Create Event
@@ -84,7 +210,7 @@ class EventUpdateView(LoginRequiredMixin, AdminOrganizerRequiredMixin, View):
     def get(self, request, id):
         event = Event.objects.get(id=id)
         form = EventForm(instance=event)
-        return render(request, self.template_name, {'form': form})
+        return render(request, self.template_name, {'form': form, 'event': event, 'attendees_form': attendees_form(event)})
 
     def post(self, request, id):
         event = Event.objects.get(id=id)
@@ -97,11 +223,31 @@ class EventUpdateView(LoginRequiredMixin, AdminOrganizerRequiredMixin, View):
                 old_image_path = os.path.join(settings.MEDIA_ROOT, old_image.name)
                 if os.path.exists(old_image_path):
                     os.remove(old_image_path)
+                delete_derivatives(old_image.name)
 
             form.save()
             messages.success(request, "Event updated successfully!")
             return redirect('event_list')
-        return render(request, self.template_name, {'form': form})
+        return render(request, self.template_name, {'form': form, 'event': event, 'attendees_form': attendees_form(event)})
+
+
+# Update Event Attendees: the picker submits a diff, applied in bulk
+def attendees_form(event, data=None):
+    return AttendeesForm(data, lookup_url=reverse('user_lookup'), event_id=event.id)
+
+
+class EventAttendeesUpdateView(LoginRequiredMixin, AdminOrganizerRequiredMixin, View):
+    def post(self, request, id):
+        event = get_object_or_404(Event.objects.only('id'), id=id)
+        form = attendees_form(event, request.POST)
+        if form.is_valid():
+            added, removed = rsvp.apply_attendee_diff(event.id, form.cleaned_data['add'], form.cleaned_data['remove'])
+            messages.success(request, f"Attendees updated: {added} added, {removed} removed.")
+        else:
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+        return redirect('event_update', id=event.id)
 
 
 # Delete Event
@@ -110,15 +256,18 @@ class EventDeleteView(LoginRequiredMixin, AdminOrganizerRequiredMixin, DeleteVie
     pk_url_kwarg = 'id'
     success_url = reverse_lazy('event_list')
 
-    def delete(self, request, *args, **kwargs):
-        event = self.get_object()
-        # Delete image file
-        if event.image and event.image.name != 'event_images/default_img.jpg':
-            image_path = os.path.join(settings.MEDIA_ROOT, event.image.name)
+    # DeleteView routes POST through form_valid, so the file cleanup lives here
+    def form_valid(self, form):
+        image = self.object.image
+        response = super().form_valid(form)
+        # Delete image file once the row is gone
+        if image and image.name != 'event_images/default_img.jpg':
+            image_path = os.path.join(settings.MEDIA_ROOT, image.name)
             if os.path.exists(image_path):
                 os.remove(image_path)
-        messages.success(request, "Event deleted successfully")
-        return super().delete(request, *args, **kwargs)
+            delete_derivatives(image.name)
+        messages.success(self.request, "Event deleted successfully")
+        return response
 
 
 # Category List
@@ -181,11 +330,25 @@ class CategoryDeleteView(LoginRequiredMixin, AdminOrganizerRequiredMixin, Delete
 # RSVP Event
 class RSVPEventView(LoginRequiredMixin, ParticipantRequiredMixin, View):
     def post(self, request, event_id):
-        event = Event.objects.get(id=event_id)
-        user = request.user
-        if user in event.participants.all():
-            messages.warning(request, "You have already RSVPed to this event.")
-        else:
-            event.participants.add(user)
-            messages.success(request, "RSVP successful! A confirmation email has been sent.")
-        return redirect('home')
\ No newline at end of file
+        try:
+            status = rsvp.rsvp(event_id, request.user)
+        except Event.DoesNotExist:
+            raise Http404("Event not found")
+        level, message = RSVP_MESSAGES[status]
+        messages.add_message(request, level, message)
+        return redirect('home')
+
+
+# Exports
+class EventExportView(LoginRequiredMixin, AdminOrganizerRequiredMixin, View):
+    def get(self, request):
+        filters = EventFilters(request.GET)
+        events = filters.apply(Event.objects.all()).order_by('date', 'time', 'id')
+        return export_response(EVENT_EXPORT_COLUMNS, events, export_format(request), 'events')
+
+
+class EventParticipantsExportView(LoginRequiredMixin, AdminOrganizerRequiredMixin, View):
+    def get(self, request, id):
+        event = get_object_or_404(Event.objects.only('id'), id=id)
+        participants = Event.participants.through.objects.filter(event_id=event.id).order_by('id')
+        return export_response(PARTICIPANT_EXPORT_COLUMNS, participants, export_format(request), f'event_{event.id}_participants')
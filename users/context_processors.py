@@ -0,0 +1,7 @@
+from django.utils.functional import SimpleLazyObject
+
+from users.roles import get_user_roles
+
+
+def roles(request):
+    return {'user_roles': SimpleLazyObject(lambda: get_user_roles(request))}
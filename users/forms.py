@@ -1,7 +1,7 @@
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm, PasswordResetForm, SetPasswordForm, PasswordChangeForm
 from django.contrib.auth.models import Permission, Group
 from django import forms
-from events.forms import StyledFormMixin
+from events.forms import StyledFormMixin, ImageDerivativesMixin
 import re
 from django.contrib.auth import get_user_model
 
@@ -68,7 +68,9 @@ class CreateGroupForm(StyledFormMixin, forms.ModelForm):
         model = Group
         fields = ['name']
 
-class EitProfileForm(StyledFormMixin, forms.ModelForm):
+class EitProfileForm(ImageDerivativesMixin, StyledFormMixin, forms.ModelForm):
+    image_fields = ('profile_picture',)
+
     class Meta:
         model = User
         fields = ['first_name', 'last_name', 'email', 'phone_number', 'profile_picture']
@@ -6,5 +6,11 @@ class CustomUser(AbstractUser):
     profile_picture = models.ImageField(upload_to='profile_pics', blank=True, default='profile_pics/default_img.jpg')
     phone_number = models.CharField(max_length=15, validators=[RegexValidator(r'^\+?\d{10,15}$')], blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Participant list sorted by email, keyset-paginated on (email, id)
+            models.Index(fields=['email', 'id'], name='user_email_id_idx'),
+        ]
+
     def __str__(self):
         return self.username
\ No newline at end of file
@@ -0,0 +1,98 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from core.cache import is_process_local
+
+SESSION_KEY = '_role_names'
+GROUPS_VERSION_KEY = 'roles:version:groups'
+
+
+def user_version_key(user_id):
+    return f'roles:version:user:{user_id}'
+
+
+def get_roles_cache():
+    return caches[settings.ROLES_CACHE_ALIAS]
+
+
+def versions_shared():
+    return not is_process_local(get_roles_cache())
+
+
+# Versions live in the shared cache; a session copy of the role names is only trusted while both versions match
+def role_versions(user_id):
+    cache = get_roles_cache()
+    keys = [user_version_key(user_id), GROUPS_VERSION_KEY]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed from the clock so an evicted key never matches a version stored before the eviction
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(key):
+    cache = get_roles_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def invalidate_user_roles(user_id):
+    bump(user_version_key(user_id))
+
+
+def invalidate_all_roles():
+    bump(GROUPS_VERSION_KEY)
+
+
+def get_user_roles(request):
+    # At most one group query per request: memoized on request.user, reused from the session across requests
+    user = request.user
+    if not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, '_role_names', None)
+    if roles is not None:
+        return roles
+
+    if not versions_shared():
+        # Without a shared version there is no safe way to trust a copy: read the groups every request
+        roles = frozenset(user.groups.values_list('name', flat=True))
+        user._role_names = roles
+        return roles
+
+    session = getattr(request, 'session', None)
+    versions = role_versions(user.pk)
+    cached = session.get(SESSION_KEY) if session is not None else None
+    if cached and cached.get('versions') == versions:
+        roles = frozenset(cached['names'])
+    else:
+        roles = frozenset(user.groups.values_list('name', flat=True))
+        if session is not None:
+            session[SESSION_KEY] = {'names': sorted(roles), 'versions': versions}
+
+    user._role_names = roles
+    return roles
+
+
+def has_role(request, *names):
+    return not get_user_roles(request).isdisjoint(names)
+
+
+# Async views
+async def aget_request_user(request):
+    # Resolved once on the event loop and pinned to the request, so sync code that runs later for it
+    # (role checks, context processors, templates) reuses the instance instead of loading it again
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def ahas_role(request, *names):
+    # The session and group lookups are sync-only
+    return await sync_to_async(has_role)(request, *names)
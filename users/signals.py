@@ -1,9 +1,11 @@
 from django.conf import settings
 from django.core.mail import send_mail
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from users.roles import invalidate_user_roles, invalidate_all_roles
 
 User = get_user_model()
 @receiver(post_save, sender=User)
@@ -18,4 +20,24 @@ def send_activation_email(sender, instance, created, **kwargs):
             send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient_list, fail_silently=False)
             print(f"Activation email sent to {instance.email}")
         except Exception as e:
-            print(f"Failed to send activation email to {instance.email}: {str(e)}")
\ No newline at end of file
+            print(f"Failed to send activation email to {instance.email}: {str(e)}")
+
+
+# Drop cached role names when membership or group names change (AssignRoleView, GroupEditView, admin)
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_member_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_user_roles(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidate_user_roles(user_id)
+    else:
+        invalidate_all_roles()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_roles(sender, **kwargs):
+    invalidate_all_roles()
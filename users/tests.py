@@ -1,3 +1,250 @@
-from django.test import TestCase
+import tempfile
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.contrib.auth.tokens import default_token_generator
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlencode, urlsafe_base64_encode
+
+from core.testing import (
+    QueryBudgetMixin, add_rsvps, make_categories, make_events, make_role_user, make_users,
+)
+from users.roles import SESSION_KEY, has_role
+
+User = get_user_model()
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_categories(1)[0]
+        cls.admin = make_role_user('admin', 'Admin')
+        cls.organizer = make_role_user('organizer', 'Organizer')
+        cls.participant = make_role_user('participant', 'Participant')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def grow_users(self, rows):
+        make_users(rows, role='Participant')
+
+    def grow_events(self, rows):
+        make_events(rows, self.category)
+
+    def grow_rsvps(self, rows):
+        # The participant RSVPs to every new event
+        add_rsvps(self.participant, make_events(rows, self.category, days=1))
+
+    def grow_groups(self, rows):
+        permissions = list(Permission.objects.all()[:5])
+        for group in Group.objects.bulk_create([Group(name=f'Group {Group.objects.count()}-{i}') for i in range(rows)]):
+            group.permissions.add(*permissions)
+
+    # Authentication
+    def test_sign_in(self):
+        self.client.logout()
+        self.assertQueryBudget(0, reverse('sign_in'), self.grow_users)
+
+    def test_sign_up(self):
+        self.client.logout()
+        self.assertQueryBudget(0, reverse('sign_up'), self.grow_users)
+
+    def test_sign_out(self):
+        def grow(rows):
+            self.grow_users(rows)
+            self.client.force_login(self.admin)
+        self.assertQueryBudget(4, reverse('sign_out'), grow, method='post', status=302)
+
+    def test_activate_user(self):
+        def grow(rows):
+            self.grow_users(rows)
+            user = User.objects.bulk_create([User(username=f'inactive{rows}', is_active=False)])[0]
+            return reverse('activate_user', args=[user.id, default_token_generator.make_token(user)])
+        self.client.logout()
+        self.assertQueryBudget(2, lambda url: url, grow, status=302)
+
+    # Dashboards
+    def test_admin_dashboard(self):
+        self.assertQueryBudget(9, reverse('admin_dashboard'), self.grow_users)
+
+    def test_organizer_dashboard(self):
+        self.client.force_login(self.organizer)
+        self.assertQueryBudget(8, reverse('organizer_dashboard'), self.grow_events)
+
+    def test_participant_dashboard(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(7, reverse('participant_dashboard'), self.grow_rsvps)
+
+    def test_async_admin_dashboard(self):
+        self.assertQueryBudget(6, reverse('async_admin_dashboard'), self.grow_users)
+
+    def test_async_organizer_dashboard(self):
+        self.client.force_login(self.organizer)
+        self.assertQueryBudget(5, reverse('async_organizer_dashboard'), self.grow_events)
+
+    def test_async_participant_dashboard(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(4, reverse('async_participant_dashboard'), self.grow_rsvps)
+
+    # Roles & Groups
+    def test_assign_role(self):
+        group = Group.objects.get(name='Organizer')
+        self.assertQueryBudget(
+            11, lambda user: reverse('assign_role', args=[user.id]),
+            lambda rows: make_users(rows, role='Participant')[-1],
+            method='post', data={'role_id': group.id}, status=302,
+        )
+
+    def test_create_group(self):
+        self.assertQueryBudget(6, reverse('create_group'), self.grow_groups)
+
+    def test_group_list(self):
+        self.assertQueryBudget(8, reverse('group_list'), self.grow_groups)
+
+    def test_group_edit(self):
+        group = Group.objects.get(name='Participant')
+        self.assertQueryBudget(7, reverse('group_edit', args=[group.id]), self.grow_users)
+
+    def test_group_delete(self):
+        def grow(rows):
+            group = Group.objects.create(name=f'Members of {rows}')
+            group.user_set.add(*make_users(rows))
+            return group
+        self.assertQueryBudget(10, lambda group: reverse('group_delete', args=[group.id]), grow, method='post', status=302)
+
+    # Participants
+    def test_participant_list(self):
+        self.assertQueryBudget(8, reverse('participant_list'), self.grow_users)
+
+    def test_participant_list_sorted_by_rsvp_count(self):
+        params = {'sort': '-rsvp_count', 'q': 'user'}
+        url = f"{reverse('participant_list')}?{urlencode(params)}"
+        self.assertQueryBudget(8, url, lambda rows: add_rsvps(make_users(1)[0], make_events(rows, self.category)))
+        self.grow_users(30)
+        first = self.client.get(reverse('participant_list'), {**params, 'format': 'json'}).json()
+        self.assertEqual([row['rsvp_count'] for row in first['results'][:3]], [1000, 10, 0])
+        second = self.client.get(reverse('participant_list'), {**params, 'format': 'json', 'cursor': first['next']}).json()
+        self.assertTrue(all(row['rsvp_count'] == 0 for row in second['results']))
+
+    def test_delete_participant(self):
+        def grow(rows):
+            user = make_users(1, role='Participant')[0]
+            add_rsvps(user, make_events(rows, self.category))
+            return user
+        self.assertQueryBudget(15, lambda user: reverse('delete_participant', args=[user.id]), grow, method='post', status=302)
+
+    def test_user_lookup(self):
+        self.assertQueryBudget(7, f"{reverse('user_lookup')}?q=user", self.grow_users)
+
+    def test_user_lookup_for_event(self):
+        event = make_events(1, self.category)[0]
+        add_rsvps(self.participant, [event])
+        self.assertQueryBudget(7, f"{reverse('user_lookup')}?event={event.id}", lambda rows: add_rsvps(self.organizer, make_events(rows, self.category)))
+        results = self.client.get(reverse('user_lookup'), {'event': event.id}).json()['results']
+        self.assertEqual(results, [{'id': self.participant.id, 'username': 'participant', 'email': 'participant@example.com'}])
+
+    # Profile & Password
+    def test_profile(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(2, reverse('profile'), self.grow_rsvps)
+
+    def test_edit_profile(self):
+        self.client.force_login(self.participant)
+        self.assertQueryBudget(2, reverse('eit-profile'), self.grow_rsvps)
+
+    def test_change_password(self):
+        self.assertQueryBudget(2, reverse('change-password'), self.grow_users)
+
+    def test_password_change_done(self):
+        self.assertQueryBudget(2, reverse('password_change_done'), self.grow_users)
+
+    def test_password_reset(self):
+        self.client.logout()
+        self.assertQueryBudget(0, reverse('password-reset'), self.grow_users)
+
+    def test_password_reset_confirm(self):
+        self.client.logout()
+        url = reverse('password_reset_confirm', args=[
+            urlsafe_base64_encode(force_bytes(self.participant.pk)),
+            default_token_generator.make_token(self.participant),
+        ])
+        self.assertQueryBudget(5, url, self.grow_users, status=302)
+
+
+class AdminDashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_role_user('admin', 'Admin')
+        cls.organizer = make_role_user('organizer', 'Organizer')
+        cls.participant = make_role_user('participant', 'Participant')
+        # Two groups: the lowest group id wins, as user.groups.first() did
+        cls.participant.groups.add(Group.objects.get(name='Organizer'))
+        cls.nobody = make_users(1, prefix='nobody')[0]
+        add_rsvps(cls.participant, make_events(2, make_categories(1)[0], days=1))
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def dashboard(self, **params):
+        return self.client.get(reverse('admin_dashboard'), {'format': 'json', **params}).json()
+
+    def test_roles_and_totals(self):
+        roles = {row['username']: row['role'] for row in self.dashboard()['results']}
+        self.assertEqual(roles, {
+            'admin': 'Admin', 'nobody3': 'None', 'organizer': 'Organizer', 'participant': 'Organizer',
+        })
+        response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(
+            [response.context[name] for name in ('total_users', 'total_events', 'total_categories', 'total_rsvps')],
+            [4, 2, 1, 2],
+        )
+
+    def test_search_and_pages(self):
+        self.assertEqual([row['username'] for row in self.dashboard(q='ORGANIZER@')['results']], ['organizer'])
+        make_users(30, prefix='zz')
+        first = self.dashboard()
+        self.assertEqual(len(first['results']), 25)
+        second = self.dashboard(cursor=first['next'])
+        self.assertEqual(len(second['results']), 9)
+        self.assertIsNone(second['next'])
+
+
+class RoleResolutionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_group = Group.objects.create(name='Admin')
+        cls.participant_group = Group.objects.create(name='Participant')
+        cls.user = make_role_user('demoted', 'Admin')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def demote_elsewhere(self):
+        # Another worker's change: the rows move, but no signal reaches this process
+        User.groups.through.objects.filter(customuser_id=self.user.id).delete()
+        User.groups.through.objects.create(customuser_id=self.user.id, group_id=self.participant_group.id)
+
+    def test_process_local_cache_never_trusts_the_session_copy(self):
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 200)
+        self.demote_elsewhere()
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 403)
+
+    def test_shared_cache_drops_the_role_on_the_next_request(self):
+        with tempfile.TemporaryDirectory() as location:
+            shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={**settings.CACHES, 'roles': shared}, ROLES_CACHE_ALIAS='roles'):
+                self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 200)
+                self.assertIn(SESSION_KEY, self.client.session)
+
+                self.user.groups.set([self.participant_group])
+                self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 403)
+                self.assertEqual(self.client.session[SESSION_KEY]['names'], ['Participant'])
+
+                # The session copy is reused while the versions hold
+                request = RequestFactory().get('/')
+                request.user, request.session = self.user, {SESSION_KEY: self.client.session[SESSION_KEY]}
+                with self.assertNumQueries(0):
+                    self.assertTrue(has_role(request, 'Participant'))
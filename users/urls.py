@@ -2,8 +2,9 @@ from django.urls import path
 from users.views import (
     SignInView, SignUpView, SignOutView, ActivateUserView,
     AdminDashboardView, OrganizerDashboardView, ParticipantDashboardView,
+    AsyncAdminDashboardView, AsyncOrganizerDashboardView, AsyncParticipantDashboardView,
     AssignRoleView, CreateGroupView, GroupListView, GroupEditView, GroupDeleteView,
-    ParticipantListView, DeleteParticipantView,
+    ParticipantListView, DeleteParticipantView, UserLookupView,
     ProfileView, EitProfileView, PasswordChange,
     CustomPasswordResetDoneView, CustomPasswordResetView, CustomPasswordResetConfirmView
 )
@@ -19,6 +20,9 @@ urlpatterns = [
     path('admin_dashboard/', AdminDashboardView.as_view(), name='admin_dashboard'),
     path('organizer_dashboard/', OrganizerDashboardView.as_view(), name='organizer_dashboard'),
     path('participant_dashboard/', ParticipantDashboardView.as_view(), name='participant_dashboard'),
+    path('async/admin_dashboard/', AsyncAdminDashboardView.as_view(), name='async_admin_dashboard'),
+    path('async/organizer_dashboard/', AsyncOrganizerDashboardView.as_view(), name='async_organizer_dashboard'),
+    path('async/participant_dashboard/', AsyncParticipantDashboardView.as_view(), name='async_participant_dashboard'),
 
     # Roles & Groups
     path('assign_role/<int:user_id>/', AssignRoleView.as_view(), name='assign_role'),
@@ -30,6 +34,7 @@ urlpatterns = [
     # Participants
     path('participants/', ParticipantListView.as_view(), name='participant_list'),
     path('delete_participants/<int:user_id>/', DeleteParticipantView.as_view(), name='delete_participant'),
+    path('lookup/', UserLookupView.as_view(), name='user_lookup'),
 
     # Profile & Password
     path('profile/', ProfileView.as_view(), name='profile'),
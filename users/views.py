@@ -1,3 +1,6 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import redirect, HttpResponse
 from django.contrib.auth import login, logout, get_user_model
 from django.contrib.auth.models import Group
@@ -7,8 +10,14 @@ from django.views.generic import View, TemplateView, FormView, UpdateView, ListV
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
 from events.models import Event, Category
-from django.db.models import Count
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils.timezone import now
+from core.pagination import KeysetPaginationMixin
+from core.queries import alist, count_many, estimated_count
+from events.views import EVENT_JSON_FIELDS, AsyncAccessMixin
+from events.stats import aevent_statistics, event_statistics
+from users.roles import has_role
 from users.forms import CustomRegistrationForm, LoginForm, CreateGroupForm, EitProfileForm, CustomPasswordChangeForm, CustomPasswordResetForm, CustomPasswordResetConfirmForm
 from django.contrib.auth.views import PasswordChangeView, PasswordResetView, PasswordResetConfirmView, PasswordResetDoneView
 
@@ -19,19 +28,19 @@ User = get_user_model()
 class AdminRequiredMixin(UserPassesTestMixin):
     login_url = 'no_permission'
     def test_func(self):
-        return self.request.user.groups.filter(name='Admin').exists()
+        return has_role(self.request, 'Admin')
 
 
 class AdminOrganizerMixin(UserPassesTestMixin):
     login_url = 'no_permission'
     def test_func(self):
-        return self.request.user.groups.filter(name__in=['Admin', 'Organizer']).exists()
+        return has_role(self.request, 'Admin', 'Organizer')
 
 
 class AdminParticipantMixin(UserPassesTestMixin):
     login_url = 'no_permission'
     def test_func(self):
-        return self.request.user.groups.filter(name__in=['Admin', 'Participant']).exists()
+        return has_role(self.request, 'Admin', 'Participant')
 
 
 # User Authentication
@@ -87,72 +96,146 @@ class ActivateUserView(View):
 
 
 # Dashboards
-class AdminDashboardView(LoginRequiredMixin, AdminRequiredMixin, TemplateView):
+def dashboard_users(search=None):
+    # Lowest-id group, as user.groups.first() did, resolved in the listing query itself
+    first_group = (
+        User.groups.through.objects
+        .filter(customuser_id=OuterRef('pk'))
+        .order_by('group_id')
+        .values('group__name')[:1]
+    )
+    users = User.objects.only('id', 'username', 'email').annotate(
+        role=Coalesce(Subquery(first_group), Value("None")),
+    )
+    if search:
+        users = users.filter(Q(username__icontains=search) | Q(email__icontains=search))
+    return users
+
+
+def dashboard_totals():
+    return count_many(
+        total_users=User.objects.all(),
+        total_events=Event.objects.all(),
+        total_categories=Category.objects.all(),
+        total_rsvps=Event.participants.through.objects.all(),
+    )
+
+
+ORGANIZER_EVENT_LISTS = {
+    'upcoming': (lambda today: Q(date__gte=today), "Upcoming Events"),
+    'past': (lambda today: Q(date__lt=today), "Past Events"),
+    'all': (lambda today: Q(), "All Events"),
+    'today': (lambda today: Q(date=today), "Today's Events"),
+}
+
+
+def organizer_events(event_filter):
+    condition, list_title = ORGANIZER_EVENT_LISTS.get(event_filter, ORGANIZER_EVENT_LISTS['today'])
+    return Event.objects.filter(condition(now().date())).select_related('category'), list_title
+
+
+def participant_events():
+    return Event.objects.filter(date__gte=now().date()).select_related('category')
+
+
+class AdminDashboardView(LoginRequiredMixin, AdminRequiredMixin, KeysetPaginationMixin, TemplateView):
     template_name = 'admin/admin.html'
+    page_size = 25
+    keyset_ordering = ('username', 'id')
+    json_fields = ('id', 'username', 'email', 'role')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        users = User.objects.prefetch_related('groups')
-        for user in users:
-            user.role = user.groups.first().name if user.groups.exists() else "None"
+        page = self.paginate_keyset(dashboard_users(self.request.GET.get('q')))
+        context.update(dashboard_totals())
         context.update({
-            'total_users': User.objects.count(),
-            'total_events': Event.objects.count(),
-            'total_categories': Category.objects.count(),
-            'total_rsvps': Event.objects.aggregate(total=Count('participants'))['total'],
-            'users': users,
+            'users': page,
+            'page': page,
+            'search': self.request.GET.get('q', ''),
             'groups': Group.objects.all(),
         })
         return context
 
 
-class OrganizerDashboardView(LoginRequiredMixin, AdminOrganizerMixin, TemplateView):
+class OrganizerDashboardView(LoginRequiredMixin, AdminOrganizerMixin, KeysetPaginationMixin, TemplateView):
     template_name = 'admin/organizer.html'
+    json_fields = EVENT_JSON_FIELDS
+
+    def get_keyset_ordering(self):
+        if self.request.GET.get('filter') == 'past':
+            return ('-date', '-time', '-id')
+        return self.keyset_ordering
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        total_events = Event.objects.count()
-        upcoming_events = Event.objects.filter(date__gte=now().date()).count()
-        past_events = Event.objects.filter(date__lt=now().date()).count()
-        total_participants = Event.objects.aggregate(total_participants=Count('participants'))['total_participants']
-        today_events = Event.objects.filter(date=now().date()).select_related('category').prefetch_related('participants')
-
-        event_filter = self.request.GET.get('filter', 'today')
-        if event_filter == 'upcoming':
-            filtered_events = Event.objects.filter(date__gte=now().date()).select_related('category').order_by('date')
-            list_title = "Upcoming Events"
-        elif event_filter == 'past':
-            filtered_events = Event.objects.filter(date__lt=now().date()).select_related('category').order_by('-date')
-            list_title = "Past Events"
-        elif event_filter == 'all':
-            filtered_events = Event.objects.all()
-            list_title = "All Events"
-        else:
-            filtered_events = today_events
-            list_title = "Today's Events"
+        filtered_events, list_title = organizer_events(self.request.GET.get('filter', 'today'))
+        page = self.paginate_keyset(filtered_events)
 
+        context.update(event_statistics())
         context.update({
-            'total_events': total_events,
-            'upcoming_events': upcoming_events,
-            'past_events': past_events,
-            'total_participants': total_participants,
-            'today_events': today_events,
-            'filtered_events': filtered_events,
+            'filtered_events': page,
+            'page': page,
             'list_title': list_title,
         })
         return context
 
 
-class ParticipantDashboardView(LoginRequiredMixin, AdminParticipantMixin, TemplateView):
+class ParticipantDashboardView(LoginRequiredMixin, AdminParticipantMixin, KeysetPaginationMixin, TemplateView):
     template_name = 'admin/participant.html'
+    json_fields = EVENT_JSON_FIELDS
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        events = Event.objects.filter(date__gte=now().date()).select_related('category').order_by('date')
-        context['events'] = events
+        page = self.paginate_keyset(participant_events())
+        context.update({'events': page, 'page': page})
         return context
 
 
+# Async dashboards: the listing page and the headline numbers are independent, so they are awaited together
+class AsyncAdminDashboardView(AsyncAccessMixin, KeysetPaginationMixin, TemplateView):
+    template_name = AdminDashboardView.template_name
+    page_size = AdminDashboardView.page_size
+    keyset_ordering = AdminDashboardView.keyset_ordering
+    json_fields = AdminDashboardView.json_fields
+    required_roles = ('Admin',)
+
+    async def get(self, request, *args, **kwargs):
+        search = request.GET.get('q')
+        page, totals, groups = await asyncio.gather(
+            self.apaginate_keyset(dashboard_users(search)),
+            # One round trip for all four counts beats four acount() calls
+            sync_to_async(dashboard_totals)(),
+            alist(Group.objects.all()),
+        )
+        return self.render_to_response(self.get_context_data(
+            **totals, users=page, page=page, search=search or '', groups=groups,
+        ))
+
+
+class AsyncOrganizerDashboardView(AsyncAccessMixin, KeysetPaginationMixin, TemplateView):
+    template_name = OrganizerDashboardView.template_name
+    json_fields = OrganizerDashboardView.json_fields
+    required_roles = ('Admin', 'Organizer')
+    get_keyset_ordering = OrganizerDashboardView.get_keyset_ordering
+
+    async def get(self, request, *args, **kwargs):
+        filtered_events, list_title = organizer_events(request.GET.get('filter', 'today'))
+        page, stats = await asyncio.gather(self.apaginate_keyset(filtered_events), aevent_statistics())
+        return self.render_to_response(self.get_context_data(
+            **stats, filtered_events=page, page=page, list_title=list_title,
+        ))
+
+
+class AsyncParticipantDashboardView(AsyncAccessMixin, KeysetPaginationMixin, TemplateView):
+    template_name = ParticipantDashboardView.template_name
+    json_fields = ParticipantDashboardView.json_fields
+    required_roles = ('Admin', 'Participant')
+
+    async def get(self, request, *args, **kwargs):
+        page = await self.apaginate_keyset(participant_events())
+        return self.render_to_response(self.get_context_data(events=page, page=page))
+
+
 # Role Assignment
 class AssignRoleView(LoginRequiredMixin, AdminRequiredMixin, View):
     def post(self, request, user_id):
@@ -214,10 +297,51 @@ class GroupDeleteView(LoginRequiredMixin, AdminRequiredMixin, DeleteView):
 
 
 # Participant Management
-class ParticipantListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
-    model = User
+# Participant List: one annotated page query and one (estimated) count, however many users there are
+PARTICIPANT_SORTS = {
+    'username': ('username', 'id'),
+    'email': ('email', 'id'),
+    'rsvp_count': ('rsvp_count', 'id'),
+}
+
+
+class ParticipantListView(LoginRequiredMixin, AdminRequiredMixin, KeysetPaginationMixin, TemplateView):
     template_name = 'admin/participant_list.html'
-    context_object_name = 'participants'
+    page_size = 25
+    json_fields = ('id', 'username', 'email', 'rsvp_count')
+
+    @property
+    def sort(self):
+        sort = self.request.GET.get('sort', 'username')
+        return sort if sort.lstrip('-') in PARTICIPANT_SORTS else 'username'
+
+    def get_keyset_ordering(self):
+        prefix = '-' if self.sort.startswith('-') else ''
+        return tuple(prefix + field for field in PARTICIPANT_SORTS[self.sort.lstrip('-')])
+
+    def get_users(self):
+        users = User.objects.all()
+        search = self.request.GET.get('q', '').strip()
+        if search:
+            users = users.filter(Q(username__icontains=search) | Q(email__icontains=search))
+        return users
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        users = self.get_users()
+        page = self.paginate_keyset(
+            users.only('id', 'username', 'email').annotate(rsvp_count=Count('rsvp_events'))
+        )
+        total, estimated = estimated_count(users)
+        context.update({
+            'participants': page,
+            'page': page,
+            'total': total,
+            'total_estimated': estimated,
+            'search': self.request.GET.get('q', ''),
+            'sort': self.sort,
+        })
+        return context
 
 
 class DeleteParticipantView(LoginRequiredMixin, AdminRequiredMixin, DeleteView):
@@ -229,6 +353,24 @@ class DeleteParticipantView(LoginRequiredMixin, AdminRequiredMixin, DeleteView):
         messages.success(request, "Participant deleted successfully.")
         return super().delete(request, *args, **kwargs)
 
+
+# User Lookup: paged prefix search behind the participant picker
+class UserLookupView(LoginRequiredMixin, AdminOrganizerMixin, KeysetPaginationMixin, View):
+    page_size = 20
+    keyset_ordering = ('username', 'id')
+    json_fields = ('id', 'username', 'email')
+
+    def get(self, request):
+        users = User.objects.only('id', 'username', 'email')
+        search = request.GET.get('q', '').strip()
+        if search:
+            users = users.filter(Q(username__istartswith=search) | Q(email__istartswith=search))
+        event_id = request.GET.get('event', '')
+        if event_id.isdigit():
+            users = users.filter(rsvp_events=event_id)
+        return self.keyset_json_response(self.paginate_keyset(users))
+
+
 # View Profile
 class ProfileView(LoginRequiredMixin, TemplateView):
     template_name = 'accounts/profile.html'
@@ -278,7 +420,7 @@ class PasswordChange(LoginRequiredMixin, PasswordChangeView):
 
 # Password Reset - Email Sent
 class CustomPasswordResetDoneView(PasswordResetDoneView):
-    template_name = 'accounts/password_reset_done.html'
+    template_name = 'accounts/password_change_done.html'
 
 
 # Password Reset - Send Email